@@ -0,0 +1,29 @@
+# bench/bench_id_generator.py
+# ============================================================
+# Microbenchmark generator kode vouch.
+# Jalankan dari root repo: python -m bench.bench_id_generator
+# ============================================================
+
+import secrets
+import timeit
+
+from utils.id_generator import IDGenerator
+
+
+def _legacy_generate(prefix: str = "V", length: int = 12, group_size: int = 4) -> str:
+    raw_token = "".join(
+        secrets.choice(IDGenerator.ALPHABET) for _ in range(length)
+    )
+    groups = [raw_token[i : i + group_size] for i in range(0, length, group_size)]
+    return f"{prefix}-" + "-".join(groups)
+
+
+if __name__ == "__main__":
+    runs = 10_000
+    legacy = timeit.timeit(_legacy_generate, number=runs) / runs
+    single = timeit.timeit(IDGenerator.generate, number=runs) / runs
+    batch  = timeit.timeit(lambda: IDGenerator.generate_batch(runs), number=1) / runs
+
+    print(f"legacy secrets.choice : {legacy * 1e6:8.2f} µs/code")
+    print(f"generate()            : {single * 1e6:8.2f} µs/code")
+    print(f"generate_batch({runs}) : {batch * 1e6:8.2f} µs/code")
@@ -37,6 +37,13 @@ class Config:
     raw_guild = os.getenv("GUILD_ID", "")
     TEST_GUILD_ID = int(raw_guild) if raw_guild.isdigit() else None
 
+    # ── Logging ──────────────────────────────────────────────
+    # "text" (default) atau "json" (satu objek JSON per baris)
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text").strip().lower()
+
+    # Lag event loop (ms) di atas nilai ini dicatat beserta stack-nya
+    LOOP_LAG_THRESHOLD_MS = max(10, _parse_int("LOOP_LAG_THRESHOLD_MS", 250))
+
     # ── Staff Roles ──────────────────────────────────────────
     # FIX: Key sebelumnya tidak konsisten antara config.py dan .env
     # Standardisasi menggunakan format ROLE_X_IDS (plural)
@@ -57,5 +64,36 @@ class Config:
     # ── Channels ──────────────────────────────────────────────
     VOUCH_LOG_CHANNEL_ID = _parse_int("VOUCH_LOG_CHANNEL_ID", 0)
 
+    # ── Database ──────────────────────────────────────────────
+    # Jumlah koneksi SQLite long-lived di dalam pool
+    DB_POOL_SIZE = max(1, _parse_int("DB_POOL_SIZE", 4))
+
+    # Cache profile (reputation, voucher) di memori
+    PROFILE_CACHE_SIZE        = _parse_int("PROFILE_CACHE_SIZE", 2048)
+    PROFILE_CACHE_TTL_SECONDS = _parse_int("PROFILE_CACHE_TTL_SECONDS", 300)
+
+    # ── Vouch ─────────────────────────────────────────────────
+    # Interval (menit) background task yang meng-expire kode kedaluwarsa
+    VOUCH_EXPIRY_SWEEP_MINUTES = max(1, _parse_int("VOUCH_EXPIRY_SWEEP_MINUTES", 10))
+
+    # Interval rekonsiliasi role member vs status kode vouch (menit)
+    ROLE_RECONCILE_MINUTES = max(1, _parse_int("ROLE_RECONCILE_MINUTES", 60))
+
+    # Rate limit (token bucket): BURST = kapasitas, PER_MINUTE = isi ulang per menit
+    REDEEM_USER_BURST        = _parse_int("REDEEM_USER_BURST", 5)
+    REDEEM_USER_PER_MINUTE   = _parse_int("REDEEM_USER_PER_MINUTE", 5)
+    REDEEM_GUILD_BURST       = _parse_int("REDEEM_GUILD_BURST", 60)
+    REDEEM_GUILD_PER_MINUTE  = _parse_int("REDEEM_GUILD_PER_MINUTE", 120)
+    GENERATE_USER_BURST      = _parse_int("GENERATE_USER_BURST", 3)
+    GENERATE_USER_PER_MINUTE = _parse_int("GENERATE_USER_PER_MINUTE", 6)
+    GENERATE_GUILD_BURST     = _parse_int("GENERATE_GUILD_BURST", 30)
+    GENERATE_GUILD_PER_MINUTE = _parse_int("GENERATE_GUILD_PER_MINUTE", 60)
+
+    # Batas jumlah kode per /vouch_bulk
+    VOUCH_BULK_MAX = max(1, _parse_int("VOUCH_BULK_MAX", 5000))
+
+    # Laju maksimum giliran perubahan role member per detik
+    ROLE_EDITS_PER_SECOND = max(1, _parse_int("ROLE_EDITS_PER_SECOND", 5))
+
 
 config = Config()
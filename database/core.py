@@ -1,10 +1,35 @@
 import os
+import asyncio
+from contextlib import asynccontextmanager
+
 import aiosqlite
 
+from config import config
+
 
 class DatabaseCore:
-    def __init__(self, db_path: str = "database/bot_data.sqlite"):
+    """
+    Pool koneksi SQLite long-lived.
+
+    Setiap koneksi dibuka sekali, dikonfigurasi dengan PRAGMA sekali,
+    lalu dipinjam lewat get_connection() dan dikembalikan ke pool.
+    """
+
+    PRAGMAS = (
+        "PRAGMA foreign_keys = ON;",
+        "PRAGMA journal_mode = WAL;",
+    )
+
+    def __init__(
+        self,
+        db_path: str = "database/bot_data.sqlite",
+        pool_size: int = config.DB_POOL_SIZE,
+    ):
         self.db_path = db_path
+        self.pool_size = pool_size
+        self._pool: asyncio.Queue[aiosqlite.Connection] | None = None
+        self._connections: list[aiosqlite.Connection] = []
+        self._pool_lock = asyncio.Lock()
         self._ensure_folder_exists()
 
     def _ensure_folder_exists(self):
@@ -12,14 +37,69 @@ class DatabaseCore:
         if folder and not os.path.exists(folder):
             os.makedirs(folder)
 
-    def get_connection(self):
-        return aiosqlite.connect(self.db_path)
+    async def _open_connection(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.db_path)
+        for pragma in self.PRAGMAS:
+            await db.execute(pragma)
+        await db.commit()
+        return db
 
-    async def setup_core(self):
+    async def _ensure_pool(self) -> asyncio.Queue:
+        if self._pool is not None:
+            return self._pool
+
+        async with self._pool_lock:
+            if self._pool is None:
+                pool: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+                for _ in range(self.pool_size):
+                    db = await self._open_connection()
+                    self._connections.append(db)
+                    pool.put_nowait(db)
+                self._pool = pool
+        return self._pool
+
+    @asynccontextmanager
+    async def get_connection(self):
+        """
+        Meminjam satu koneksi dari pool.
+        Transaksi yang tidak di-commit akan di-rollback saat dikembalikan.
+        """
+        pool = await self._ensure_pool()
+        db = await pool.get()
+        try:
+            yield db
+        finally:
+            try:
+                if db.in_transaction:
+                    await db.rollback()
+            finally:
+                pool.put_nowait(db)
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Meminjam koneksi dan membuka BEGIN IMMEDIATE.
+        Commit jika blok selesai normal, rollback jika terjadi exception.
+        """
         async with self.get_connection() as db:
-            await db.execute("PRAGMA foreign_keys = ON;")
-            await db.execute("PRAGMA journal_mode = WAL;")
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                await db.rollback()
+                raise
             await db.commit()
 
+    async def setup_core(self):
+        await self._ensure_pool()
+
+    async def close(self):
+        """Menutup semua koneksi di pool. Dipanggil saat bot shutdown."""
+        async with self._pool_lock:
+            connections, self._connections = self._connections, []
+            self._pool = None
+            for db in connections:
+                await db.close()
+
 
 db_core = DatabaseCore()
@@ -0,0 +1,112 @@
+import asyncio
+import importlib
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import aiosqlite
+
+from database.core import db_core
+from utils.logger import logger
+
+MigrationFunc = Callable[[aiosqlite.Connection], Awaitable[None]]
+
+# Semua modul yang mendaftarkan migrasi. Di-import oleh run() sebelum
+# migrasi dijalankan, jadi urutan import di tempat lain tidak berpengaruh.
+MIGRATION_MODULES = (
+    "modules.vouch.db",
+    "modules.profile.db",
+    "modules.vouch.outbox",
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: MigrationFunc
+
+
+class MigrationRunner:
+    """
+    Menjalankan migrasi schema bernomor berdasarkan PRAGMA user_version.
+
+    Nomor versi berlaku global untuk seluruh database, jadi setiap modul
+    mengambil nomor berikutnya yang belum dipakai dan modulnya
+    dicantumkan di MIGRATION_MODULES. Tiap migrasi dijalankan tepat
+    sekali di dalam transaksinya sendiri.
+
+    Contoh:
+        @migrations.register(3, "add index on vouch_codes")
+        async def _add_index(db):
+            await db.execute("CREATE INDEX ...")
+    """
+
+    def __init__(self):
+        self._migrations: dict[int, Migration] = {}
+        self._lock = asyncio.Lock()
+
+    def register(self, version: int, description: str):
+        if version < 1:
+            raise ValueError("Migration version harus >= 1.")
+
+        def decorator(func: MigrationFunc) -> MigrationFunc:
+            existing = self._migrations.get(version)
+            if existing and existing.apply is not func:
+                raise ValueError(
+                    f"Migration version {version} sudah dipakai oleh "
+                    f"'{existing.description}'."
+                )
+            self._migrations[version] = Migration(version, description, func)
+            return func
+
+        return decorator
+
+    def _load_modules(self) -> None:
+        for module_name in MIGRATION_MODULES:
+            importlib.import_module(module_name)
+
+        # Nomor yang bolong berarti ada modul migrasi yang tidak terdaftar;
+        # gagal keras daripada menjalankan schema setengah jadi.
+        missing = sorted(set(range(1, max(self._migrations, default=0) + 1)) - set(self._migrations))
+        if missing:
+            raise RuntimeError(
+                f"Migration version {missing} tidak terdaftar. "
+                f"Tambahkan modulnya ke MIGRATION_MODULES."
+            )
+
+    async def _get_user_version(self, db: aiosqlite.Connection) -> int:
+        async with db.execute("PRAGMA user_version") as cursor:
+            return (await cursor.fetchone())[0]
+
+    async def run(self) -> int:
+        """
+        Menerapkan semua migrasi yang tertunda.
+
+        Returns:
+            Versi schema setelah migrasi.
+        """
+        async with self._lock:
+            self._load_modules()
+
+            async with db_core.get_connection() as db:
+                current = await self._get_user_version(db)
+
+            pending = sorted(v for v in self._migrations if v > current)
+            if not pending:
+                return current
+
+            for version in pending:
+                migration = self._migrations[version]
+                async with db_core.transaction() as db:
+                    # Cek ulang di dalam transaksi jika proses lain lebih dulu
+                    if await self._get_user_version(db) >= version:
+                        continue
+                    await migration.apply(db)
+                    await db.execute(f"PRAGMA user_version = {int(version)}")
+                logger.info(f"Migration {version} applied: {migration.description}")
+                current = version
+
+            return current
+
+
+migrations = MigrationRunner()
@@ -4,22 +4,46 @@
 # Bertanggung jawab untuk:
 #   1. Inisialisasi bot dan intents
 #   2. Load semua modul dari folder /modules
-#   3. Sync slash commands ke guild atau global
+#   3. Sync slash commands ke guild atau global (hanya jika berubah)
 # ============================================================
 
 import os
+import json
+import time
 import asyncio
+import hashlib
+import argparse
 import platform
 import discord
 from discord.ext import commands
 
 from config import config
-from utils.logger import logger
+from utils.logger import logger, shutdown_logging
+from utils.loop_watchdog import loop_watchdog
 from database.core import db_core
+from database.migrations import migrations
+
+# Hash command tree terakhir yang berhasil di-sync, per scope (guild / global)
+COMMAND_HASH_PATH = "database/command_sync.json"
+
+# Modul yang cog_load-nya harus menunggu modul lain selesai di-load
+# (folder → dependency). Saat ini kosong: migrasi sudah dijalankan
+# setup_hook sebelum cog mana pun di-load, dan import silang antar modul
+# (mis. profile/service.py → vouch_db) ditangani oleh sistem import Python.
+MODULE_DEPENDENCIES: dict[str, tuple[str, ...]] = {}
 
 
 class ApostleBot(commands.Bot):
-    def __init__(self):
+    def __init__(self, force_sync: bool = False):
+        self.force_sync = force_sync
+
+        # Durasi tiap fase startup (ms), dilaporkan sekali saat on_ready
+        self.startup_timings: dict[str, float] = {}
+        self._startup_started = time.perf_counter()
+        self._setup_finished: float | None = None
+        self._extension_started: dict[str, float] = {}
+        self._startup_reported = False
+
         intents = discord.Intents.default()
         intents.members = True
 
@@ -34,21 +58,35 @@ class ApostleBot(commands.Bot):
         """
         Dipanggil oleh discord.py sebelum bot login.
         Urutan eksekusi:
-            1. Setup database core
+            0. Start watchdog lag event loop
+            1. Setup database core & jalankan semua migrasi
             2. Load semua extension (cog) dari /modules
             3. Sync slash commands
         """
+        # ── 0. Loop Watchdog ──────────────────────────────────
+        loop_watchdog.start()
+
         # ── 1. Setup Database ─────────────────────────────────
+        started = time.perf_counter()
         await db_core.setup_core()
+        self._record_phase("db_init", started)
         logger.info("Database core initialized.")
 
+        # Semua migrasi dijalankan di sini sebelum cog mana pun di-load;
+        # migrasi yang bolong/gagal menghentikan startup.
+        started = time.perf_counter()
+        schema_version = await migrations.run()
+        self._record_phase("migrations", started)
+        logger.info(f"Database schema at version {schema_version}.")
+
         # ── 2. Load Modules ───────────────────────────────────
         modules_folder = "modules"
         if not os.path.exists(modules_folder):
             os.makedirs(modules_folder)
             logger.warning(f"Folder '{modules_folder}' tidak ditemukan, dibuat baru.")
 
-        for folder_name in os.listdir(modules_folder):
+        module_names = []
+        for folder_name in sorted(os.listdir(modules_folder)):
             folder_path = os.path.join(modules_folder, folder_name)
             cog_path    = os.path.join(folder_path, "cog.py")
 
@@ -58,24 +96,136 @@ class ApostleBot(commands.Bot):
             if not os.path.exists(cog_path):
                 continue
 
+            module_names.append(folder_name)
+
+        started = time.perf_counter()
+        await self._load_modules(modules_folder, module_names)
+        self._record_phase("modules_total", started)
+
+        # ── 3. Sync Slash Commands ────────────────────────────
+        started = time.perf_counter()
+        await self._sync_commands()
+        self._record_phase("command_sync", started)
+
+        self._setup_finished = time.perf_counter()
+
+    def _record_phase(self, phase: str, started: float) -> None:
+        self.startup_timings[phase] = (time.perf_counter() - started) * 1000
+
+    async def _load_modules(self, modules_folder: str, module_names: list[str]) -> None:
+        """
+        Load extension secara bersamaan. Modul yang tercantum di
+        MODULE_DEPENDENCIES menunggu dependency-nya selesai lebih dulu;
+        jika dependency gagal, modul tersebut tidak di-load.
+        """
+
+        async def load(folder_name: str) -> bool:
+            for dependency in MODULE_DEPENDENCIES.get(folder_name, ()):
+                if dependency in load_tasks and not await load_tasks[dependency]:
+                    logger.error(
+                        f"❌ Skipped {folder_name}: dependency '{dependency}' failed to load."
+                    )
+                    return False
+
             extension_name = f"{modules_folder}.{folder_name}.cog"
+            self._extension_started[extension_name] = time.perf_counter()
             try:
                 await self.load_extension(extension_name)
-                logger.info(f"✅ Module loaded: {extension_name}")
             except Exception as error:
                 logger.error(f"❌ Failed to load {extension_name}: {error}")
+                return False
+            finally:
+                self._extension_started.pop(extension_name, None)
 
-        # ── 3. Sync Slash Commands ────────────────────────────
+            logger.info(f"✅ Module loaded: {extension_name}")
+            return True
+
+        load_tasks = {
+            folder_name: asyncio.create_task(load(folder_name))
+            for folder_name in module_names
+        }
+        await asyncio.gather(*load_tasks.values())
+
+    async def add_cog(self, cog: commands.Cog, /, **kwargs) -> None:
+        # load_extension meng-import modul lalu memanggil setup() → add_cog()
+        # tanpa await di antaranya, jadi selisih waktu ini murni waktu import.
+        started = time.perf_counter()
+        module  = cog.__module__
+        if module in self._extension_started:
+            self._record_phase(f"import:{module}", self._extension_started[module])
+
+        await super().add_cog(cog, **kwargs)
+        self._record_phase(f"cog_load:{module}", started)
+
+    def _log_startup_report(self) -> None:
+        lines = ["Startup report:"]
+        for phase, elapsed_ms in self.startup_timings.items():
+            lines.append(f"  {phase:<36} {elapsed_ms:>9.1f} ms")
+        total_ms = (time.perf_counter() - self._startup_started) * 1000
+        lines.append(f"  {'total':<36} {total_ms:>9.1f} ms")
+        logger.info("\n".join(lines))
+
+    def _command_tree_hash(self, guild: discord.abc.Snowflake | None) -> str:
+        """SHA-256 dari payload command yang akan dikirim saat sync."""
+        payload = sorted(
+            (command.to_dict(self.tree) for command in self.tree.get_commands(guild=guild)),
+            key=lambda command: (command["type"], command["name"]),
+        )
+        serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    async def _sync_commands(self):
+        """
+        Sync slash commands hanya jika command tree berubah sejak sync
+        terakhir (atau dipaksa dengan --force-sync). Sync adalah REST call
+        yang di-rate-limit; restart berulang tidak perlu memanggilnya.
+        """
+        guild_object = None
+        scope = "global"
         if config.TEST_GUILD_ID:
             guild_object = discord.Object(id=config.TEST_GUILD_ID)
             self.tree.copy_global_to(guild=guild_object)
-            await self.tree.sync(guild=guild_object)
+            scope = f"guild:{config.TEST_GUILD_ID}"
+
+        try:
+            with open(COMMAND_HASH_PATH, encoding="utf-8") as file:
+                stored_hashes = json.load(file)
+        except (OSError, ValueError):
+            stored_hashes = {}
+
+        tree_hash = self._command_tree_hash(guild_object)
+        if not self.force_sync and stored_hashes.get(scope) == tree_hash:
+            logger.info(f"Slash commands unchanged ({scope}), sync skipped.")
+            return
+
+        await self.tree.sync(guild=guild_object)
+        if guild_object:
             logger.info(f"Slash commands synced to Test Guild ID: {config.TEST_GUILD_ID}")
         else:
-            await self.tree.sync()
             logger.info("Slash commands synced Globally (may take up to 1 hour).")
 
+        stored_hashes[scope] = tree_hash
+        try:
+            with open(COMMAND_HASH_PATH, "w", encoding="utf-8") as file:
+                json.dump(stored_hashes, file, indent=2)
+        except OSError as error:
+            logger.warning(f"Failed to store command tree hash: {error}")
+
+    async def close(self):
+        """Shutdown bot lalu tutup pool koneksi database dan watchdog."""
+        await super().close()
+        await db_core.close()
+        logger.info("Database connection pool closed.")
+        await loop_watchdog.close()
+
     async def on_ready(self):
+        if not self._startup_reported:
+            self._startup_reported = True
+            # Dari selesai setup_hook (login + koneksi gateway) sampai READY
+            if self._setup_finished is not None:
+                self._record_phase("gateway_ready", self._setup_finished)
+            self._log_startup_report()
+
         logger.info("=" * 50)
         logger.info(f"Bot Online  : {self.user} (ID: {self.user.id})")
         logger.info(f"Python      : {platform.python_version()}")
@@ -97,12 +247,12 @@ class ApostleBot(commands.Bot):
         logger.error(f"Command error: {error}")
 
 
-async def main():
+async def main(force_sync: bool = False):
     if not config.TOKEN:
         logger.critical("DISCORD_TOKEN tidak ditemukan di .env! Bot tidak bisa dijalankan.")
         return
 
-    bot = ApostleBot()
+    bot = ApostleBot(force_sync=force_sync)
 
     try:
         async with bot:
@@ -116,7 +266,18 @@ async def main():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ApostleBot")
+    parser.add_argument(
+        "--force-sync",
+        action="store_true",
+        help="Sync slash commands walaupun command tree tidak berubah",
+    )
+    args = parser.parse_args()
+
     try:
-        asyncio.run(main())
+        asyncio.run(main(force_sync=args.force_sync))
     except KeyboardInterrupt:
         pass
+    finally:
+        # Flush sisa log di queue sebelum proses keluar
+        shutdown_logging()
@@ -0,0 +1,13 @@
+from database.migrations import migrations
+
+
+@migrations.register(2, "create user_profiles")
+async def _create_user_profiles(db) -> None:
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS user_profiles (
+            user_id    INTEGER PRIMARY KEY,
+            reputation INTEGER NOT NULL DEFAULT 0,
+            voucher_id INTEGER
+        )
+    """)
+
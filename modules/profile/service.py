@@ -33,35 +33,66 @@ TIER_VOUCH_CONFIG = {
 }
 
 
+def _build_role_index() -> dict[int, tuple[int, str]]:
+    """
+    Peta role_id → (rank, tier_name), dibangun sekali dari Config.
+    Rank lebih kecil = tier lebih tinggi (urutan ROLE_HIERARCHY).
+    """
+    index: dict[int, tuple[int, str]] = {}
+    for rank, (config_attr, tier_name) in enumerate(ROLE_HIERARCHY):
+        for role_id in getattr(config, config_attr, []):
+            index.setdefault(role_id, (rank, tier_name))
+    return index
+
+
+ROLE_TIER_INDEX = _build_role_index()
+
+# Subset index yang hanya berisi tier yang boleh generate vouch
+VOUCH_ROLE_INDEX = {
+    role_id: entry
+    for role_id, entry in ROLE_TIER_INDEX.items()
+    if entry[1] in TIER_VOUCH_CONFIG
+}
+
+VOUCH_TIERS = {
+    tier_name: {
+        "tier_name": tier_name,
+        **vouch_config,
+        "color": TIER_COLORS.get(tier_name, 0x95A5A6),
+    }
+    for tier_name, vouch_config in TIER_VOUCH_CONFIG.items()
+}
+
+HIDDEN_ROLE_IDS = frozenset(
+    config.MEMBER_ROLES
+    + config.FRIENDS_ROLES
+    + config.VISITORS_ROLES
+    + config.IGNORED_ROLES
+)
+
+
+def _resolve_tier(member: discord.Member, index: dict[int, tuple[int, str]]) -> str | None:
+    """Satu kali jalan atas role member, ambil tier dengan rank terkecil."""
+    best = None
+    for role in member.roles:
+        entry = index.get(role.id)
+        if entry is not None and (best is None or entry[0] < best[0]):
+            best = entry
+    return best[1] if best else None
+
+
 class ProfileService:
 
     @staticmethod
     def get_main_role(member: discord.Member) -> str:
-        user_role_ids = {role.id for role in member.roles}
-
-        for config_attr, tier_name in ROLE_HIERARCHY:
-            role_id_list = getattr(config, config_attr, [])
-            if any(role_id in user_role_ids for role_id in role_id_list):
-                return tier_name
-
-        return "Visitors"
+        return _resolve_tier(member, ROLE_TIER_INDEX) or "Visitors"
 
     @staticmethod
     def get_vouch_tier(member: discord.Member) -> dict | None:
-        user_role_ids = {role.id for role in member.roles}
-
-        for config_attr, tier_name in ROLE_HIERARCHY:
-            if tier_name not in TIER_VOUCH_CONFIG:
-                continue
-            role_id_list = getattr(config, config_attr, [])
-            if any(role_id in user_role_ids for role_id in role_id_list):
-                return {
-                    "tier_name": tier_name,
-                    **TIER_VOUCH_CONFIG[tier_name],
-                    "color": TIER_COLORS.get(tier_name, 0x95A5A6),
-                }
-
-        return None
+        tier_name = _resolve_tier(member, VOUCH_ROLE_INDEX)
+        if tier_name is None:
+            return None
+        return dict(VOUCH_TIERS[tier_name])
 
     @staticmethod
     async def build_embed(
@@ -180,17 +211,10 @@ class ProfileService:
             inline=False,
         )
 
-        roles_to_hide = set(
-            config.MEMBER_ROLES
-            + config.FRIENDS_ROLES
-            + config.VISITORS_ROLES
-            + config.IGNORED_ROLES
-        )
-
         display_roles = [
             role.mention
             for role in reversed(target.roles)
-            if role.name != "@everyone" and role.id not in roles_to_hide
+            if role.name != "@everyone" and role.id not in HIDDEN_ROLE_IDS
         ]
 
         roles_display = " ".join(display_roles) if display_roles else "_No notable roles_"
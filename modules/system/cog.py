@@ -0,0 +1,82 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from modules.vouch.db import vouch_db
+from utils.interaction_budget import latency_stats
+from utils.loop_watchdog import loop_watchdog
+
+
+class SystemCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @app_commands.command(
+        name="loop_stats",
+        description="Show event loop lag statistics (Admin Only)",
+    )
+    @app_commands.guild_only()
+    @app_commands.default_permissions(administrator=True)
+    async def loop_stats(self, interaction: discord.Interaction):
+        stats = loop_watchdog.snapshot()
+
+        peak = max(stats["histogram"].values(), default=0) or 1
+        histogram_lines = [
+            f"{label:>10} │ {'█' * round(count / peak * 20):<20} {count}"
+            for label, count in stats["histogram"].items()
+        ]
+
+        stats_embed = discord.Embed(
+            title="🩺  Event Loop Lag",
+            description="```\n" + "\n".join(histogram_lines) + "\n```",
+            color=discord.Color.blurple(),
+        )
+        stats_embed.add_field(name="Samples",   value=str(stats["samples"]),          inline=True)
+        stats_embed.add_field(name="Average",   value=f"{stats['avg_ms']:.1f} ms",    inline=True)
+        stats_embed.add_field(name="Max",       value=f"{stats['max_ms']:.0f} ms",    inline=True)
+        stats_embed.add_field(name="Gateway",   value=f"{self.bot.latency * 1000:.0f} ms", inline=True)
+
+        if stats["stalls"]:
+            stall_lines = [
+                f"<t:{int(stall['at'])}:R> · {stall['blocked_ms']:.0f} ms · `{stall['running'][:60]}`"
+                for stall in reversed(stats["stalls"][-5:])
+            ]
+            stats_embed.add_field(
+                name="Recent Stalls",
+                value="\n".join(stall_lines),
+                inline=False,
+            )
+
+        # Handler terlambat di atas; mendekati 3000 ms berarti nyaris gagal merespons
+        handlers = sorted(
+            latency_stats.snapshot().items(),
+            key=lambda item: item[1]["max_ms"],
+            reverse=True,
+        )
+        if handlers:
+            handler_lines = [
+                f"`{name}` · avg {entry['avg_ms']:.0f} / max {entry['max_ms']:.0f} ms"
+                f" · {entry['auto_deferred']}/{entry['count']} auto-deferred"
+                for name, entry in handlers[:5]
+            ]
+            stats_embed.add_field(
+                name="Handler Latency",
+                value="\n".join(handler_lines),
+                inline=False,
+            )
+
+        cache = vouch_db.profile_cache_stats()
+        stats_embed.add_field(
+            name="Profile Cache",
+            value=(
+                f"{cache['hit_rate']:.0%} hit rate · {cache['hits']} hit / {cache['misses']} miss"
+                f" · {cache['size']}/{cache['maxsize']} entries"
+            ),
+            inline=False,
+        )
+
+        await interaction.response.send_message(embed=stats_embed, ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(SystemCog(bot))
@@ -1,14 +1,24 @@
+import io
 import discord
 import asyncio
+import time
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 from config import config
 from modules.vouch.db import vouch_db
-from modules.vouch.views import VouchView, SetupView, send_log
+from modules.vouch.outbox import dm_outbox
+from modules.vouch.reconciler import reconcile_roles
+from modules.vouch.views import VouchView, VouchMenuButton, SetupView, send_log
 from modules.vouch.views.first_time_view import FirstTimeRedeemView
+from modules.vouch.views.helpers import log_sink, role_scheduler
 from modules.profile.service import ProfileService
-from utils.id_generator import IDGenerator
+from utils.interaction_budget import latency_budget, respond
+from utils.logger import logger
+
+# /vouch_bulk: tampilkan progres mulai jumlah ini, daftar inline sampai jumlah ini
+BULK_PROGRESS_THRESHOLD = 1000
+BULK_INLINE_LIMIT       = 20
 
 
 class VouchCog(commands.Cog):
@@ -20,6 +30,59 @@ class VouchCog(commands.Cog):
 
         self.bot.add_view(SetupView())
         self.bot.add_view(FirstTimeRedeemView())
+        self.bot.add_dynamic_items(VouchMenuButton)
+
+        self.expiry_sweeper.start()
+        self.role_reconciler.start()
+        log_sink.start()
+        role_scheduler.start()
+        await dm_outbox.start(self.bot)
+
+    async def cog_unload(self):
+        self.expiry_sweeper.cancel()
+        self.role_reconciler.cancel()
+        self.bot.remove_dynamic_items(VouchMenuButton)
+        await role_scheduler.close()
+        await log_sink.close()
+        await dm_outbox.close()
+
+    @tasks.loop(minutes=config.VOUCH_EXPIRY_SWEEP_MINUTES)
+    async def expiry_sweeper(self):
+        """Meng-expire kode ACTIVE yang sudah lewat 3 hari secara berkala."""
+        started = time.perf_counter()
+        try:
+            expired = await vouch_db.expire_overdue()
+        except Exception as error:
+            # Jangan hentikan loop; sweep berikutnya akan mencoba lagi
+            logger.error(f"Expiry sweep failed: {error}")
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Expiry sweep: {expired} code(s) expired in {elapsed_ms:.1f} ms.")
+
+    @tasks.loop(minutes=config.ROLE_RECONCILE_MINUTES)
+    async def role_reconciler(self):
+        """Menerapkan ulang perubahan role redeem/revoke yang belum terkonfirmasi."""
+        for guild in self.bot.guilds:
+            try:
+                report = await reconcile_roles(guild)
+            except Exception as error:
+                logger.error(f"Role reconcile failed for guild {guild.id}: {error}")
+                continue
+
+            logger.info(
+                f"Role reconcile ({guild.id}): checked {report['codes_checked']} code(s), "
+                f"{report['missing_granted']} missing / {report['lingering_revoked']} lingering "
+                f"role(s), {report['skipped_conflict']} conflict, {report['unassignable']} unassignable, "
+                f"{report['members_fixed']} fixed, {report['members_failed']} failed, "
+                f"{report['given_up']} given up "
+                f"in {report['elapsed_ms']} ms."
+            )
+
+    @role_reconciler.before_loop
+    async def before_role_reconciler(self):
+        # Cache member harus sudah terisi
+        await self.bot.wait_until_ready()
 
     @app_commands.command(
         name="vouch",
@@ -27,17 +90,20 @@ class VouchCog(commands.Cog):
     )
     @app_commands.guild_only()
     async def vouch_base(self, interaction: discord.Interaction):
+        # Mulai ambil data menu segera, berjalan bersamaan dengan animasi loading
+        prefetch = asyncio.create_task(self._prefetch_menu_data(interaction.user))
 
         loading_emoji = "<a:discord_loading:1474248558776549427>"
         await interaction.response.send_message(
             content=f"{loading_emoji} **Establishing secure connection...**",
             ephemeral=True,
         )
-        await asyncio.sleep(0.6)
-        await interaction.edit_original_response(
-            content=f"{loading_emoji} **Verifying credentials...**"
-        )
-        await asyncio.sleep(0.6)
+        # Frame kedua hanya ditampilkan jika data belum siap
+        if not prefetch.done():
+            await interaction.edit_original_response(
+                content=f"{loading_emoji} **Verifying credentials...**"
+            )
+        menu_data = await prefetch
 
         user_role_ids = {role.id for role in interaction.user.roles}
         has_member  = any(r_id in user_role_ids for r_id in config.MEMBER_ROLES)
@@ -58,7 +124,7 @@ class VouchCog(commands.Cog):
             )
             return
 
-        vouch_tier = ProfileService.get_vouch_tier(interaction.user)
+        vouch_tier = menu_data["vouch_tier"]
         can_generate = vouch_tier is not None
         can_redeem   = not (has_member or has_friends)
 
@@ -74,7 +140,24 @@ class VouchCog(commands.Cog):
                      if interaction.user.display_avatar else None,
         )
 
+        menu_embed.add_field(
+            name="⭐  Reputation",
+            value=f"**{menu_data['reputation']}** Points",
+            inline=True,
+        )
+
         if can_generate and vouch_tier:
+            cooldown_ms = menu_data["cooldown_ms"]
+            if cooldown_ms:
+                ready_at = int(time.time() + cooldown_ms / 1000)
+                cooldown_text = f"Ready <t:{ready_at}:R>"
+            else:
+                cooldown_text = "✅ Ready"
+            menu_embed.add_field(
+                name="⏳  Generate Cooldown",
+                value=cooldown_text,
+                inline=True,
+            )
             menu_embed.set_footer(
                 text=f"Detected Tier: {vouch_tier['tier_name']} · "
                      f"Cooldown: {vouch_tier['cooldown']} minutes · "
@@ -87,6 +170,24 @@ class VouchCog(commands.Cog):
             view=VouchView(can_generate=can_generate, can_redeem=can_redeem),
         )
 
+    async def _prefetch_menu_data(self, member: discord.Member) -> dict:
+        """
+        Resolusi tier, sisa cooldown, dan profile untuk menu /vouch.
+        Hasilnya juga menghangatkan cache cooldown & profile di vouch_db,
+        sehingga tombol Generate / My Profile tidak perlu query ulang.
+        """
+        vouch_tier  = ProfileService.get_vouch_tier(member)
+        cooldown_ms = (
+            vouch_db.cooldown_remaining(member.id, vouch_tier["cooldown"])
+            if vouch_tier else 0
+        )
+        profile_row = await vouch_db.get_user_profile(member.id)
+
+        return {
+            "vouch_tier":  vouch_tier,
+            "cooldown_ms": cooldown_ms,
+            "reputation":  profile_row[0] if profile_row else 0,
+        }
 
     @app_commands.command(
         name="vouch_bulk",
@@ -111,9 +212,9 @@ class VouchCog(commands.Cog):
             )
             return
 
-        if not (1 <= amount <= 20):
+        if not (1 <= amount <= config.VOUCH_BULK_MAX):
             await interaction.response.send_message(
-                content="⚠️ Amount of codes must be between **1** and **20**.",
+                content=f"⚠️ Amount of codes must be between **1** and **{config.VOUCH_BULK_MAX}**.",
                 ephemeral=True,
             )
             return
@@ -123,48 +224,77 @@ class VouchCog(commands.Cog):
         vouch_tier = ProfileService.get_vouch_tier(target)
         rep_value  = vouch_tier["rep"] if vouch_tier else 0
 
-        generated_codes = []
-        for _ in range(amount):
-            new_code = IDGenerator.generate()
-            await vouch_db.create_vouch(
-                code=new_code,
+        async def report_progress(inserted: int, total: int) -> None:
+            if total < BULK_PROGRESS_THRESHOLD:
+                return
+            # Progress hanya kosmetik; kegagalan edit tidak boleh menghentikan insert
+            try:
+                await interaction.edit_original_response(
+                    content=f"⏳ Generating codes... **{inserted}/{total}**"
+                )
+            except discord.HTTPException as error:
+                logger.warning(f"Bulk progress update failed: {error}")
+
+        try:
+            generated_codes = await vouch_db.create_vouches_bulk(
+                amount=amount,
                 guild_id=interaction.guild_id,
                 role_id=role.id,
                 creator_id=target.id,
                 rep_value=rep_value,
+                progress=report_progress,
             )
-            generated_codes.append(new_code)
+        except Exception as error:
+            # Chunk yang sudah di-commit di-revoke oleh create_vouches_bulk
+            logger.error(f"Bulk generate of {amount} code(s) failed: {error}")
+            await interaction.followup.send(
+                content="❌ Failed to generate the codes. No codes were created, please try again.",
+                ephemeral=True,
+            )
+            return
+
+        # Kode dikirim sebagai lampiran .txt; daftar inline hanya untuk jumlah kecil
+        codes_text = "\n".join(generated_codes) + "\n"
+        file_name  = f"vouch_codes_{target.id}_{role.id}.txt"
+
+        description = (
+            f"You have received **{amount}** vouch codes for role **{role.name}** "
+            f"from the server owner. The full list is attached."
+        )
+        if amount <= BULK_INLINE_LIMIT:
+            formatted_codes = "\n".join(f"`{code}`" for code in generated_codes)
+            description += f"\n\n{formatted_codes}"
 
-        formatted_codes = "\n".join(f"`{code}`" for code in generated_codes)
         dm_embed = discord.Embed(
             title="🎫  Bulk Vouch Codes Received",
-            description=(
-                f"You have received **{amount}** vouch codes for role **{role.name}** "
-                f"from the server owner.\n\n{formatted_codes}"
-            ),
+            description=description,
             color=discord.Color.gold(),
         )
         dm_embed.set_footer(text="These codes are valid for 3 days.")
 
-        try:
-            await target.send(embed=dm_embed)
-            await interaction.followup.send(
-                content=(
-                    f"✅ Successfully created **{amount}** codes for {target.mention}. "
-                    f"Codes have been sent to their DM."
-                ),
-                ephemeral=True,
+        if dm_outbox.is_dm_closed(target.id):
+            delivery_text = "but their DM is closed. The codes are attached below."
+        else:
+            await dm_outbox.enqueue(
+                target.id,
+                embed=dm_embed,
+                file_name=file_name,
+                file_text=codes_text,
             )
-        except discord.Forbidden:
-            codes_block = "\n".join(generated_codes)
-            await interaction.followup.send(
-                content=(
-                    f"⚠️ Successfully created **{amount}** codes for {target.mention}, "
-                    f"but their DM is closed.\n```\n{codes_block}\n```"
-                ),
-                ephemeral=True,
+            delivery_text = (
+                "and queued them for delivery to their DM. "
+                "A copy is attached here in case their DM is closed."
             )
 
+        await interaction.followup.send(
+            content=(
+                f"✅ Successfully created **{amount}** codes for {target.mention}, "
+                f"{delivery_text}"
+            ),
+            file=discord.File(io.BytesIO(codes_text.encode("utf-8")), filename=file_name),
+            ephemeral=True,
+        )
+
         log_embed = discord.Embed(title="📦  Bulk Vouch Generated", color=discord.Color.purple())
         log_embed.add_field(name="Authorized By", value=interaction.user.mention, inline=True)
         log_embed.add_field(name="Code Owner",    value=target.mention,           inline=True)
@@ -178,6 +308,7 @@ class VouchCog(commands.Cog):
     )
     @app_commands.guild_only()
     @app_commands.default_permissions(administrator=True)
+    @latency_budget("vouch.update_vouch")
     async def update_vouch(
         self,
         interaction: discord.Interaction,
@@ -188,14 +319,16 @@ class VouchCog(commands.Cog):
         is_owner = any(r_id in user_role_ids for r_id in config.OWNER_ROLES)
 
         if not is_owner and not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 content="⛔ You do not have permission to use this command.",
                 ephemeral=True,
             )
             return
 
         await vouch_db.update_voucher_manual(target.id, new_voucher.id)
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             content=(
                 f"✅ Successfully updated vouch record! "
                 f"{target.mention} is now vouched by {new_voucher.mention}."
@@ -1,77 +1,224 @@
-import aiosqlite
 import asyncio
-from datetime import datetime, timedelta, timezone
-from database.core import db_core
+import time
+from typing import Awaitable, Callable
 
-_generate_locks: dict[int, asyncio.Lock] = {}
+import aiosqlite
 
-def _get_user_lock(user_id: int) -> asyncio.Lock:
-    if user_id not in _generate_locks:
-        _generate_locks[user_id] = asyncio.Lock()
-    return _generate_locks[user_id]
+from config import config
+from database.core import db_core
+from database.migrations import migrations
+from utils.id_generator import IDGenerator
+from utils.keyed_lock import StripedLock
+from utils.ttl_cache import TTLCache, MISSING
+
+
+# Lock per-user untuk reservasi generate, memori tetap berapapun jumlah user
+_generate_locks = StripedLock(stripes=64)
+
+
+# Kode vouch berlaku 3 hari sejak dibuat
+CODE_TTL_MS = 3 * 24 * 60 * 60 * 1000
+
+# Perubahan role dari redeem/revoke yang belum dikonfirmasi berhasil
+# diambil alih rekonsiliasi setelah jeda ini (antrean inline diberi waktu)
+ROLE_FIX_GRACE_MS = 60 * 1000
+
+
+def _now_ms() -> int:
+    """Waktu sekarang dalam Unix epoch milidetik (format kolom timestamp)."""
+    return time.time_ns() // 1_000_000
+
+
+@migrations.register(1, "create vouch_codes & redeemed_users")
+async def _create_vouch_tables(db) -> None:
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS vouch_codes (
+            code        TEXT PRIMARY KEY,
+            guild_id    INTEGER NOT NULL,
+            role_id     INTEGER NOT NULL,
+            creator_id  INTEGER NOT NULL,
+            created_at  TIMESTAMP NOT NULL,
+            used_by     INTEGER,
+            status      TEXT NOT NULL DEFAULT 'ACTIVE',
+            rep_value   INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS redeemed_users (
+            user_id         INTEGER PRIMARY KEY,
+            first_redeem_at TIMESTAMP NOT NULL
+        )
+    """)
+
+    # Database lama dibuat sebelum kolom rep_value ada
+    async with db.execute("PRAGMA table_info(vouch_codes)") as cursor:
+        columns = {row[1] for row in await cursor.fetchall()}
+    if "rep_value" not in columns:
+        await db.execute(
+            "ALTER TABLE vouch_codes ADD COLUMN rep_value INTEGER NOT NULL DEFAULT 0"
+        )
+
+
+@migrations.register(3, "add secondary indexes on vouch_codes")
+async def _add_vouch_code_indexes(db) -> None:
+    # Index sekunder: can_generate & get_creator_vouches (creator/waktu),
+    # expiry per status, dan lookup siapa yang memakai kode
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_vouch_codes_creator_created
+        ON vouch_codes (creator_id, created_at)
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_vouch_codes_status_created
+        ON vouch_codes (status, created_at)
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_vouch_codes_used_by
+        ON vouch_codes (used_by)
+    """)
+
+
+@migrations.register(4, "store timestamps as integer epoch milliseconds")
+async def _timestamps_to_epoch_ms(db) -> None:
+    # Baris lama menyimpan datetime Python sebagai teks ISO; julianday()
+    # mengerti semua varian yang pernah tersimpan. Teks yang tidak bisa
+    # di-parse jatuh ke waktu migrasi (sama seperti fallback lama).
+    to_epoch_ms = """
+        COALESCE(
+            CAST(ROUND((julianday({column}) - 2440587.5) * 86400000) AS INTEGER),
+            CAST(ROUND((julianday('now') - 2440587.5) * 86400000) AS INTEGER)
+        )
+    """
+    await db.execute(
+        f"UPDATE vouch_codes SET created_at = {to_epoch_ms.format(column='created_at')} "
+        "WHERE typeof(created_at) = 'text'"
+    )
+    await db.execute(
+        f"UPDATE redeemed_users SET first_redeem_at = {to_epoch_ms.format(column='first_redeem_at')} "
+        "WHERE typeof(first_redeem_at) = 'text'"
+    )
+
+
+@migrations.register(5, "add partial index on ACTIVE vouch codes (superseded)")
+async def _add_active_codes_index(db) -> None:
+    # Dulu membuat idx_vouch_codes_active_created. Planner selalu memilih
+    # idx_vouch_codes_status_created (migration 3) untuk query ACTIVE, jadi
+    # index ini tidak dibuat lagi; nomor versi dipertahankan. Lihat migration 9.
+    pass
+
+
+@migrations.register(6, "create creator_cooldowns ledger")
+async def _create_creator_cooldowns(db) -> None:
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS creator_cooldowns (
+            creator_id        INTEGER PRIMARY KEY,
+            last_generated_at INTEGER NOT NULL
+        )
+    """)
+
+    # Isi dari histori agar cooldown yang sedang berjalan tidak ter-reset
+    await db.execute("""
+        INSERT OR IGNORE INTO creator_cooldowns (creator_id, last_generated_at)
+        SELECT creator_id, MAX(created_at) FROM vouch_codes GROUP BY creator_id
+    """)
+
+
+@migrations.register(8, "add partial index on redeemed vouch codes")
+async def _add_redeemed_codes_index(db) -> None:
+    # Covering index untuk rekonsiliasi role: (guild, status) → (user, role)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_vouch_codes_redeemed
+        ON vouch_codes (guild_id, status, used_by, role_id)
+        WHERE used_by IS NOT NULL
+    """)
+
+
+@migrations.register(9, "drop unused partial index on ACTIVE vouch codes")
+async def _drop_active_codes_index(db) -> None:
+    # Sweep expiry & load ACTIVE sudah memakai idx_vouch_codes_status_created
+    await db.execute("DROP INDEX IF EXISTS idx_vouch_codes_active_created")
+
+
+@migrations.register(10, "track status changes for incremental role reconcile")
+async def _add_status_changed_at(db) -> None:
+    async with db.execute("PRAGMA table_info(vouch_codes)") as cursor:
+        columns = {row[1] for row in await cursor.fetchall()}
+    if "status_changed_at" not in columns:
+        # NULL untuk histori lama (sebelum migrasi ini)
+        await db.execute("ALTER TABLE vouch_codes ADD COLUMN status_changed_at INTEGER")
+
+
+@migrations.register(11, "replace reconcile watermark with per-code role fixes")
+async def _create_role_fixes(db) -> None:
+    # Satu baris per kode yang perubahan role-nya belum dikonfirmasi:
+    # ditulis bersama redeem/revoke, dihapus begitu role inline berhasil.
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS role_fixes (
+            code     TEXT PRIMARY KEY,
+            guild_id INTEGER NOT NULL,
+            user_id  INTEGER NOT NULL,
+            role_id  INTEGER NOT NULL,
+            action   TEXT NOT NULL CHECK (action IN ('ADD', 'REMOVE')),
+            due_at   INTEGER NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_role_fixes_due
+        ON role_fixes (guild_id, due_at)
+    """)
+
+    # Sisa rekonsiliasi berbasis watermark (versi lama migrasi 10)
+    await db.execute("DROP INDEX IF EXISTS idx_vouch_codes_status_changed")
+    await db.execute("DROP TABLE IF EXISTS role_reconcile_state")
 
 
-def _parse_timestamp(raw: str) -> datetime:
-    if not raw:
-        return datetime.now(tz=timezone.utc)
-    try:
-        parsed = datetime.fromisoformat(raw)
-        if parsed.tzinfo is None:
-            parsed = parsed.replace(tzinfo=timezone.utc)
-        return parsed
-    except ValueError:
-        pass
+class VouchDatabase:
 
-    try:
-        clean = raw.split(".")[0].replace("T", " ")
-        parsed = datetime.strptime(clean, "%Y-%m-%d %H:%M:%S")
-        return parsed.replace(tzinfo=timezone.utc)
-    except ValueError:
-        pass
+    def __init__(self):
+        # Cache write-through creator_id → last_generated_at (epoch ms).
+        # Dimuat penuh saat setup(), jadi cache miss berarti belum pernah generate.
+        self._cooldowns: dict[int, int] = {}
 
-    return datetime.now(tz=timezone.utc)
+        # Index kode ACTIVE: code → created_at (epoch ms). Dimuat saat setup()
+        # dan dijaga oleh create/revoke/redeem/expire, sehingga kode yang
+        # tidak dikenal atau tidak aktif ditolak tanpa query database.
+        self._active_codes: dict[str, int] = {}
 
+        # Kode lama tanpa check character hanya diterima sampai kode lama
+        # terakhir yang masih ACTIVE saat startup kedaluwarsa (epoch ms)
+        self._legacy_codes_until = 0
 
-class VouchDatabase:
+        # Cache (reputation, voucher_id) per user, diperbarui oleh
+        # redeem_vouch dan update_voucher_manual (write-through)
+        self._profiles = TTLCache(
+            maxsize=config.PROFILE_CACHE_SIZE,
+            ttl=config.PROFILE_CACHE_TTL_SECONDS,
+        )
 
     async def setup(self):
         async with db_core.get_connection() as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS vouch_codes (
-                    code        TEXT PRIMARY KEY,
-                    guild_id    INTEGER NOT NULL,
-                    role_id     INTEGER NOT NULL,
-                    creator_id  INTEGER NOT NULL,
-                    created_at  TIMESTAMP NOT NULL,
-                    used_by     INTEGER,
-                    status      TEXT NOT NULL DEFAULT 'ACTIVE',
-                    rep_value   INTEGER NOT NULL DEFAULT 0
-                )
-            """)
-
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS redeemed_users (
-                    user_id         INTEGER PRIMARY KEY,
-                    first_redeem_at TIMESTAMP NOT NULL
-                )
-            """)
+            async with db.execute(
+                "SELECT creator_id, last_generated_at FROM creator_cooldowns"
+            ) as cursor:
+                self._cooldowns = dict(await cursor.fetchall())
 
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS user_profiles (
-                    user_id    INTEGER PRIMARY KEY,
-                    reputation INTEGER NOT NULL DEFAULT 0,
-                    voucher_id INTEGER
-                )
-            """)
+            async with db.execute(
+                "SELECT code, created_at FROM vouch_codes WHERE status = 'ACTIVE'"
+            ) as cursor:
+                self._active_codes = dict(await cursor.fetchall())
 
-            try:
-                await db.execute(
-                    "ALTER TABLE vouch_codes ADD COLUMN rep_value INTEGER NOT NULL DEFAULT 0"
-                )
-            except aiosqlite.OperationalError:
-                pass
+        legacy_created = [
+            created_at
+            for code, created_at in self._active_codes.items()
+            if IDGenerator.is_valid(code, allow_legacy=True)
+            and not IDGenerator.is_valid(code)
+        ]
+        self._legacy_codes_until = max(legacy_created, default=-CODE_TTL_MS) + CODE_TTL_MS
 
-            await db.commit()
+    def accepts_legacy_codes(self) -> bool:
+        """True selama masih mungkin ada kode lama (tanpa check character) yang aktif."""
+        return _now_ms() < self._legacy_codes_until
 
     async def create_vouch(
         self,
@@ -81,6 +228,7 @@ class VouchDatabase:
         creator_id: int,
         rep_value: int = 0,
     ) -> None:
+        now_ms = _now_ms()
         async with db_core.get_connection() as db:
             await db.execute(
                 """
@@ -88,23 +236,167 @@ class VouchDatabase:
                     (code, guild_id, role_id, creator_id, created_at, status, rep_value)
                 VALUES (?, ?, ?, ?, ?, 'ACTIVE', ?)
                 """,
-                (code, guild_id, role_id, creator_id, datetime.now(tz=timezone.utc), rep_value),
+                (code, guild_id, role_id, creator_id, now_ms, rep_value),
             )
             await db.commit()
 
-    async def can_generate(self, creator_id: int, cooldown_minutes: int) -> bool:
+        self._active_codes[code] = now_ms
+
+    async def create_vouches_bulk(
+        self,
+        amount: int,
+        guild_id: int,
+        role_id: int,
+        creator_id: int,
+        rep_value: int = 0,
+        progress: Callable[[int, int], Awaitable[None]] | None = None,
+        chunk_size: int = 1000,
+        max_attempts: int = 3,
+    ) -> list[str]:
+        """
+        Generate dan insert banyak kode, satu transaksi per chunk (executemany).
+        Lock tulis hanya ditahan selama insert satu chunk; progress dilaporkan
+        setelah chunk di-commit, di luar transaksi. Jika terjadi tabrakan kode,
+        hanya chunk tersebut yang di-rollback dan diulang dengan kode baru.
+        Jika gagal di tengah jalan, kode dari chunk yang sudah di-commit
+        di-revoke sebelum error diteruskan, karena kode itu tidak akan
+        pernah dikirim ke siapa pun.
+
+        Args:
+            progress : Callback opsional (inserted, total) setelah tiap chunk di-commit
+
+        Returns:
+            List kode yang berhasil dibuat.
+        """
+        codes: list[str] = []
+        now_ms = _now_ms()
+
+        try:
+            for start in range(0, amount, chunk_size):
+                size = min(chunk_size, amount - start)
+                for attempt in range(1, max_attempts + 1):
+                    chunk = IDGenerator.generate_unique(size)
+                    try:
+                        async with db_core.transaction() as db:
+                            await db.executemany(
+                                """
+                                INSERT INTO vouch_codes
+                                    (code, guild_id, role_id, creator_id, created_at, status, rep_value)
+                                VALUES (?, ?, ?, ?, ?, 'ACTIVE', ?)
+                                """,
+                                [
+                                    (code, guild_id, role_id, creator_id, now_ms, rep_value)
+                                    for code in chunk
+                                ],
+                            )
+                    except aiosqlite.IntegrityError:
+                        if attempt == max_attempts:
+                            raise
+                        continue
+                    break
+
+                codes.extend(chunk)
+                self._active_codes.update((code, now_ms) for code in chunk)
+
+                if progress:
+                    await progress(len(codes), amount)
+
+        except BaseException:
+            if codes:
+                await self._revoke_codes(codes)
+            raise
+
+        return codes
+
+    async def _revoke_codes(self, codes: list[str]) -> None:
+        async with db_core.transaction() as db:
+            await db.executemany(
+                """
+                UPDATE vouch_codes SET status = 'REVOKED', status_changed_at = ?
+                WHERE code = ? AND status = 'ACTIVE'
+                """,
+                [(_now_ms(), code) for code in codes],
+            )
+
+        for code in codes:
+            self._active_codes.pop(code, None)
+
+    def generate_lock_stats(self) -> dict:
+        return _generate_locks.stats()
+
+    def cooldown_remaining(self, creator_id: int, cooldown_minutes: int) -> int:
+        """
+        Sisa cooldown generate dalam milidetik (0 = boleh generate).
+        Dibaca dari cache saja, tanpa query database.
+        """
         if cooldown_minutes <= 0:
-            return True
+            return 0
 
-        async with _get_user_lock(creator_id):
-            limit_time = datetime.now(tz=timezone.utc) - timedelta(minutes=cooldown_minutes)
-            async with db_core.get_connection() as db:
-                async with db.execute(
-                    "SELECT COUNT(*) FROM vouch_codes WHERE creator_id = ? AND created_at >= ?",
-                    (creator_id, limit_time),
-                ) as cursor:
-                    count = (await cursor.fetchone())[0]
-                    return count == 0
+        last_generated = self._cooldowns.get(creator_id)
+        if last_generated is None:
+            return 0
+
+        ready_at = last_generated + cooldown_minutes * 60 * 1000
+        return max(0, ready_at - _now_ms())
+
+    async def generate_vouch(
+        self,
+        code: str,
+        guild_id: int,
+        role_id: int,
+        creator_id: int,
+        rep_value: int,
+        cooldown_minutes: int,
+    ) -> int:
+        """
+        Cek & reservasi cooldown lalu insert kode dalam satu transaksi,
+        sehingga insert yang gagal tidak meninggalkan cooldown tanpa kode.
+
+        Returns:
+            0 jika kode berhasil dibuat, selain itu sisa cooldown (ms).
+        """
+        async with _generate_locks(creator_id):
+            remaining = self.cooldown_remaining(creator_id, cooldown_minutes)
+            if remaining:
+                return remaining
+
+            now_ms = _now_ms()
+            async with db_core.transaction() as db:
+                if cooldown_minutes > 0:
+                    cutoff = now_ms - cooldown_minutes * 60 * 1000
+                    async with db.execute(
+                        """
+                        INSERT INTO creator_cooldowns (creator_id, last_generated_at) VALUES (?, ?)
+                        ON CONFLICT(creator_id) DO UPDATE SET
+                            last_generated_at = excluded.last_generated_at
+                        WHERE creator_cooldowns.last_generated_at <= ?
+                        RETURNING last_generated_at
+                        """,
+                        (creator_id, now_ms, cutoff),
+                    ) as cursor:
+                        reserved = await cursor.fetchone()
+
+                    if not reserved:
+                        async with db.execute(
+                            "SELECT last_generated_at FROM creator_cooldowns WHERE creator_id = ?",
+                            (creator_id,),
+                        ) as cursor:
+                            self._cooldowns[creator_id] = (await cursor.fetchone())[0]
+                        return self.cooldown_remaining(creator_id, cooldown_minutes)
+
+                await db.execute(
+                    """
+                    INSERT INTO vouch_codes
+                        (code, guild_id, role_id, creator_id, created_at, status, rep_value)
+                    VALUES (?, ?, ?, ?, ?, 'ACTIVE', ?)
+                    """,
+                    (code, guild_id, role_id, creator_id, now_ms, rep_value),
+                )
+
+            if cooldown_minutes > 0:
+                self._cooldowns[creator_id] = now_ms
+            self._active_codes[code] = now_ms
+            return 0
 
     async def get_creator_vouches(self, creator_id: int) -> list:
         async with db_core.get_connection() as db:
@@ -120,117 +412,272 @@ class VouchDatabase:
             ) as cursor:
                 return await cursor.fetchall()
 
-    async def execute_revoke(self, code: str) -> None:
+    async def get_due_role_fixes(
+        self, guild_id: int, now_ms: int
+    ) -> list[tuple[str, int, int, str, int]]:
+        """
+        Perubahan role yang belum dikonfirmasi dan sudah jatuh tempo.
+
+        Returns:
+            List (code, user_id, role_id, action, attempts), urut due_at.
+        """
         async with db_core.get_connection() as db:
-            await db.execute(
-                "UPDATE vouch_codes SET status = 'REVOKED' WHERE code = ?",
-                (code,),
-            )
+            async with db.execute(
+                """
+                SELECT code, user_id, role_id, action, attempts FROM role_fixes
+                WHERE guild_id = ? AND due_at <= ?
+                ORDER BY due_at
+                """,
+                (guild_id, now_ms),
+            ) as cursor:
+                return await cursor.fetchall()
+
+    async def clear_role_fix(self, code: str) -> None:
+        """Dipanggil setelah perubahan role inline untuk kode ini berhasil."""
+        async with db_core.get_connection() as db:
+            await db.execute("DELETE FROM role_fixes WHERE code = ?", (code,))
             await db.commit()
 
+    async def resolve_role_fixes(
+        self, done: list[str], retry: list[tuple[str, int]]
+    ) -> None:
+        """Menghapus fix yang selesai dan mencatat percobaan gagal (code, attempts)."""
+        if not done and not retry:
+            return
+
+        async with db_core.transaction() as db:
+            await db.executemany(
+                "DELETE FROM role_fixes WHERE code = ?",
+                [(code,) for code in done],
+            )
+            await db.executemany(
+                "UPDATE role_fixes SET attempts = ? WHERE code = ?",
+                [(attempts, code) for code, attempts in retry],
+            )
+
+    async def get_used_roles(self, guild_id: int, user_ids: list[int]) -> set[tuple[int, int]]:
+        """Pasangan (user_id, role_id) dari kode USED milik user yang diberikan."""
+        if not user_ids:
+            return set()
+
+        placeholders = ", ".join("?" * len(user_ids))
+        async with db_core.get_connection() as db:
+            async with db.execute(
+                f"""
+                SELECT used_by, role_id FROM vouch_codes
+                WHERE guild_id = ? AND status = 'USED' AND used_by IN ({placeholders})
+                """,
+                (guild_id, *user_ids),
+            ) as cursor:
+                return set(await cursor.fetchall())
+
+    async def execute_revoke(self, code: str) -> None:
+        now_ms = _now_ms()
+        async with db_core.transaction() as db:
+            async with db.execute(
+                """
+                UPDATE vouch_codes SET status = 'REVOKED', status_changed_at = ?
+                WHERE code = ?
+                RETURNING guild_id, used_by, role_id
+                """,
+                (now_ms, code),
+            ) as cursor:
+                revoked = await cursor.fetchone()
+
+            # Pencabutan role dicatat dulu; dihapus oleh pemanggil jika berhasil
+            if revoked and revoked[1] is not None:
+                await self._add_role_fix(db, code, *revoked, "REMOVE", now_ms)
+
+        self._active_codes.pop(code, None)
+
+    async def expire_overdue(self, chunk_size: int = 500) -> int:
+        """
+        Menandai kode ACTIVE yang sudah lewat 3 hari sebagai EXPIRED.
+        Diproses per chunk (satu transaksi per chunk) agar lock tulis
+        tidak ditahan lama dan event loop tetap mendapat giliran.
+
+        Returns:
+            Jumlah baris yang di-expire.
+        """
+        expire_limit = _now_ms() - CODE_TTL_MS
+        total = 0
+
+        while True:
+            async with db_core.transaction() as db:
+                async with db.execute(
+                    """
+                    UPDATE vouch_codes SET status = 'EXPIRED'
+                    WHERE code IN (
+                        SELECT code FROM vouch_codes
+                        WHERE status = 'ACTIVE' AND created_at < ?
+                        LIMIT ?
+                    )
+                    RETURNING code
+                    """,
+                    (expire_limit, chunk_size),
+                ) as cursor:
+                    expired_codes = await cursor.fetchall()
+
+            for (code,) in expired_codes:
+                self._active_codes.pop(code, None)
+
+            affected = len(expired_codes)
+            total += affected
+            if affected < chunk_size:
+                return total
+            await asyncio.sleep(0)
+
     async def redeem_vouch(
         self, code: str, user_id: int
     ) -> tuple[bool, int | None, bool, str]:
         """
-        Memproses redemption kode vouch.
+        Memproses redemption kode vouch dalam satu transaksi IMMEDIATE.
+        Kode di-klaim lewat UPDATE bersyarat, jadi satu kode hanya bisa
+        dipakai sekali walaupun di-redeem bersamaan.
         
         Returns:
             (success, role_id, is_first_time, message)
         """
-        async with db_core.get_connection() as db:
+        now_ms       = _now_ms()
+        expire_limit = now_ms - CODE_TTL_MS
+
+        # Tolak tanpa menyentuh SQLite jika kode tidak ada di index ACTIVE
+        created_at = self._active_codes.get(code)
+        if created_at is None:
+            return False, None, False, "Kode tidak ditemukan atau sudah tidak aktif."
+        if created_at < expire_limit:
+            # Status EXPIRED di database akan ditulis oleh expiry sweeper
+            self._active_codes.pop(code, None)
+            return False, None, False, "Kode sudah kedaluwarsa (lebih dari 3 hari)."
+
+        async with db_core.transaction() as db:
+            # Klaim kode: hanya berhasil jika masih ACTIVE dan belum lewat 3 hari
             async with db.execute(
-                "SELECT role_id, status, created_at, creator_id, rep_value FROM vouch_codes WHERE code = ?",
-                (code,),
+                """
+                UPDATE vouch_codes SET status = 'USED', used_by = ?, status_changed_at = ?
+                WHERE code = ? AND status = 'ACTIVE' AND created_at >= ?
+                RETURNING guild_id, role_id, creator_id, rep_value
+                """,
+                (user_id, now_ms, code, expire_limit),
             ) as cursor:
-                row = await cursor.fetchone()
+                claimed = await cursor.fetchone()
+
+            if not claimed:
+                self._active_codes.pop(code, None)
+                async with db.execute(
+                    "SELECT status, created_at FROM vouch_codes WHERE code = ?",
+                    (code,),
+                ) as cursor:
+                    row = await cursor.fetchone()
 
-            if not row:
-                return False, None, False, "Kode tidak ditemukan."
+                if not row:
+                    return False, None, False, "Kode tidak ditemukan."
 
-            role_id, status, created_at_raw, creator_id, rep_value = row
-            created_at = _parse_timestamp(created_at_raw)
-            now_utc    = datetime.now(tz=timezone.utc)
+                status, created_at = row
 
-            # Auto-expire jika sudah lewat 3 hari
-            if status == "ACTIVE" and (now_utc - created_at) > timedelta(days=3):
-                await db.execute(
-                    "UPDATE vouch_codes SET status = 'EXPIRED' WHERE code = ?",
-                    (code,),
-                )
-                await db.commit()
-                return False, None, False, "Kode sudah kedaluwarsa (lebih dari 3 hari)."
+                # Auto-expire jika sudah lewat 3 hari
+                if status == "ACTIVE" and created_at < expire_limit:
+                    await db.execute(
+                        "UPDATE vouch_codes SET status = 'EXPIRED' WHERE code = ?",
+                        (code,),
+                    )
+                    return False, None, False, "Kode sudah kedaluwarsa (lebih dari 3 hari)."
 
-            if status != "ACTIVE":
                 return False, None, False, f"Kode sudah berstatus **{status.lower()}**."
 
-            # Tandai kode sebagai USED
-            await db.execute(
-                "UPDATE vouch_codes SET status = 'USED', used_by = ? WHERE code = ?",
-                (user_id, code),
-            )
+            guild_id, role_id, creator_id, rep_value = claimed
 
-            # Cek apakah first-time redeem
-            async with db.execute(
-                "SELECT user_id FROM redeemed_users WHERE user_id = ?",
-                (user_id,),
-            ) as cursor:
-                first_time_row = await cursor.fetchone()
+            # Pemberian role dicatat dulu; dihapus oleh pemanggil jika berhasil
+            await self._add_role_fix(db, code, guild_id, user_id, role_id, "ADD", now_ms)
 
-            is_first_time = first_time_row is None
-            if is_first_time:
-                await db.execute(
-                    "INSERT INTO redeemed_users (user_id, first_redeem_at) VALUES (?, ?)",
-                    (user_id, now_utc),
-                )
+            # First-time redeem jika baris baru benar-benar ter-insert
+            cursor = await db.execute(
+                """
+                INSERT INTO redeemed_users (user_id, first_redeem_at) VALUES (?, ?)
+                ON CONFLICT(user_id) DO NOTHING
+                """,
+                (user_id, now_ms),
+            )
+            is_first_time = cursor.rowcount == 1
+            await cursor.close()
 
-            # Update atau insert profil user
             async with db.execute(
-                "SELECT reputation FROM user_profiles WHERE user_id = ?",
-                (user_id,),
+                """
+                INSERT INTO user_profiles (user_id, reputation, voucher_id) VALUES (?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    reputation = reputation + excluded.reputation,
+                    voucher_id = excluded.voucher_id
+                RETURNING reputation, voucher_id
+                """,
+                (user_id, rep_value, creator_id),
             ) as cursor:
                 profile_row = await cursor.fetchone()
 
-            if profile_row:
-                await db.execute(
-                    "UPDATE user_profiles SET reputation = reputation + ?, voucher_id = ? WHERE user_id = ?",
-                    (rep_value, creator_id, user_id),
-                )
-            else:
-                await db.execute(
-                    "INSERT INTO user_profiles (user_id, reputation, voucher_id) VALUES (?, ?, ?)",
-                    (user_id, rep_value, creator_id),
-                )
+        # Baru dikeluarkan dari index setelah commit; jika transaksi
+        # di-rollback, kode tetap ACTIVE dan masih bisa di-redeem ulang.
+        self._active_codes.pop(code, None)
+        self._profiles.set(user_id, tuple(profile_row))
+        return True, role_id, is_first_time, "Berhasil."
 
-            await db.commit()
-            return True, role_id, is_first_time, "Berhasil."
+    @staticmethod
+    async def _add_role_fix(
+        db: aiosqlite.Connection,
+        code: str,
+        guild_id: int,
+        user_id: int,
+        role_id: int,
+        action: str,
+        now_ms: int,
+    ) -> None:
+        # Revoke menimpa fix ADD yang mungkin masih tertunda untuk kode yang sama
+        await db.execute(
+            """
+            INSERT INTO role_fixes (code, guild_id, user_id, role_id, action, due_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(code) DO UPDATE SET
+                action   = excluded.action,
+                due_at   = excluded.due_at,
+                attempts = 0
+            """,
+            (code, guild_id, user_id, role_id, action, now_ms + ROLE_FIX_GRACE_MS),
+        )
 
     async def update_voucher_manual(self, target_user_id: int, new_voucher_id: int) -> None:
-        async with db_core.get_connection() as db:
+        async with db_core.transaction() as db:
             async with db.execute(
-                "SELECT user_id FROM user_profiles WHERE user_id = ?",
-                (target_user_id,),
+                """
+                INSERT INTO user_profiles (user_id, voucher_id) VALUES (?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET voucher_id = excluded.voucher_id
+                RETURNING reputation, voucher_id
+                """,
+                (target_user_id, new_voucher_id),
             ) as cursor:
-                exists = await cursor.fetchone()
+                profile_row = await cursor.fetchone()
 
-            if exists:
-                await db.execute(
-                    "UPDATE user_profiles SET voucher_id = ? WHERE user_id = ?",
-                    (new_voucher_id, target_user_id),
-                )
-            else:
-                await db.execute(
-                    "INSERT INTO user_profiles (user_id, voucher_id) VALUES (?, ?)",
-                    (target_user_id, new_voucher_id),
-                )
-            await db.commit()
+        self._profiles.set(target_user_id, tuple(profile_row))
 
     async def get_user_profile(self, user_id: int) -> tuple | None:
-        async with db_core.get_connection() as db:
-            async with db.execute(
-                "SELECT reputation, voucher_id FROM user_profiles WHERE user_id = ?",
-                (user_id,),
-            ) as cursor:
-                return await cursor.fetchone()
+        cached = self._profiles.get(user_id)
+        if cached is not MISSING:
+            return cached
+
+        # Write-through (redeem/update) selama query berjalan membatalkan fill ini
+        token = self._profiles.begin_fill(user_id)
+        profile_row = MISSING
+        try:
+            async with db_core.get_connection() as db:
+                async with db.execute(
+                    "SELECT reputation, voucher_id FROM user_profiles WHERE user_id = ?",
+                    (user_id,),
+                ) as cursor:
+                    row = await cursor.fetchone()
+            profile_row = tuple(row) if row else None
+        finally:
+            self._profiles.end_fill(user_id, token, profile_row)
+        return profile_row
+
+    def profile_cache_stats(self) -> dict:
+        return self._profiles.stats()
 
 
 vouch_db = VouchDatabase()
@@ -0,0 +1,298 @@
+import io
+import json
+import time
+import asyncio
+
+import discord
+
+from database.core import db_core
+from database.migrations import migrations
+from utils.logger import logger
+
+# Penanda DM tertutup dianggap basi setelah 1 hari (user bisa membuka DM lagi)
+DM_CLOSED_TTL_MS = 24 * 60 * 60 * 1000
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+@migrations.register(7, "create dm_outbox & dm_closed_users")
+async def _create_dm_outbox(db) -> None:
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS dm_outbox (
+            id              INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id         INTEGER NOT NULL,
+            payload         TEXT NOT NULL,
+            attempts        INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at INTEGER NOT NULL,
+            created_at      INTEGER NOT NULL,
+            last_error      TEXT
+        )
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_dm_outbox_next_attempt
+        ON dm_outbox (next_attempt_at)
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS dm_closed_users (
+            user_id   INTEGER PRIMARY KEY,
+            closed_at INTEGER NOT NULL
+        )
+    """)
+
+
+class DMOutbox:
+    """
+    Outbox DM yang persisten.
+
+    Handler cukup memanggil enqueue() lalu kembali; worker mengirim DM
+    dengan konkurensi terbatas dan exponential backoff. Baris yang belum
+    terkirim tetap ada di tabel dm_outbox dan dilanjutkan setelah restart.
+    Penerima yang DM-nya tertutup dicatat di dm_closed_users.
+    """
+
+    # Detik menunggu pengiriman yang sedang berjalan saat close()
+    CLOSE_TIMEOUT = 10.0
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        max_attempts: int = 6,
+        base_delay: float = 5.0,
+        poll_interval: float = 30.0,
+    ):
+        self.concurrency   = concurrency
+        self.max_attempts  = max_attempts
+        self.base_delay    = base_delay
+        self.poll_interval = poll_interval
+
+        self._bot: discord.Client | None = None
+        self._worker: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._in_flight: set[int] = set()
+        # Baris yang DM-nya sudah terkirim tapi DELETE-nya gagal;
+        # percobaan berikutnya hanya menghapus, tidak mengirim ulang.
+        self._delivered: set[int] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._closed_users: dict[int, int] = {}
+
+        # ── Statistik ─────────────────────────────────────────
+        self.sent   = 0
+        self.failed = 0
+        self.closed = 0
+
+    # ── Enqueue ───────────────────────────────────────────────
+
+    async def enqueue(
+        self,
+        user_id: int,
+        content: str | None = None,
+        embed: discord.Embed | None = None,
+        file_name: str | None = None,
+        file_text: str | None = None,
+    ) -> None:
+        payload = {
+            "content": content,
+            "embed":   embed.to_dict() if embed else None,
+            "file":    {"name": file_name, "text": file_text} if file_name else None,
+        }
+        now_ms = _now_ms()
+        async with db_core.get_connection() as db:
+            await db.execute(
+                """
+                INSERT INTO dm_outbox (user_id, payload, next_attempt_at, created_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (user_id, json.dumps(payload), now_ms, now_ms),
+            )
+            await db.commit()
+        self._wakeup.set()
+
+    def is_dm_closed(self, user_id: int) -> bool:
+        """True jika DM user tercatat tertutup dalam 24 jam terakhir (tanpa query)."""
+        closed_at = self._closed_users.get(user_id)
+        return closed_at is not None and _now_ms() - closed_at < DM_CLOSED_TTL_MS
+
+    # ── Worker ────────────────────────────────────────────────
+
+    async def start(self, bot: discord.Client) -> None:
+        self._bot = bot
+
+        async with db_core.get_connection() as db:
+            async with db.execute(
+                "SELECT user_id, closed_at FROM dm_closed_users WHERE closed_at >= ?",
+                (_now_ms() - DM_CLOSED_TTL_MS,),
+            ) as cursor:
+                self._closed_users = dict(await cursor.fetchall())
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run(), name="dm-outbox")
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        # Pengiriman yang sedang berjalan harus selesai sebelum pool ditutup.
+        # Yang melewati batas waktu dibatalkan; barisnya belum dihapus
+        # sehingga dikirim ulang setelah restart.
+        if self._tasks:
+            await asyncio.wait(list(self._tasks), timeout=self.CLOSE_TIMEOUT)
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks.clear()
+
+    async def _run(self) -> None:
+        await self._bot.wait_until_ready()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def deliver(row) -> None:
+            try:
+                await self._deliver(*row)
+            except Exception as error:
+                logger.error(f"DM outbox delivery {row[0]} crashed: {error}")
+                # Payload rusak atau error tak terduga tetap dihitung sebagai
+                # percobaan, supaya baris tidak diulang tiap poll selamanya
+                if row[0] not in self._delivered:
+                    try:
+                        await self._reschedule(row[0], row[3] + 1, str(error))
+                    except Exception as reschedule_error:
+                        logger.error(f"DM outbox {row[0]} reschedule failed: {reschedule_error}")
+            finally:
+                self._in_flight.discard(row[0])
+                semaphore.release()
+
+        while True:
+            self._wakeup.clear()
+            timeout = self.poll_interval
+            try:
+                for row in await self._due_rows():
+                    await semaphore.acquire()
+                    self._in_flight.add(row[0])
+                    task = asyncio.create_task(deliver(row))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+
+                timeout = await self._idle_timeout()
+            except Exception as error:
+                # Error sementara (mis. database is locked) tidak boleh mematikan worker
+                logger.error(f"DM outbox poll failed: {error}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _idle_timeout(self) -> float:
+        """Tidur sampai retry terdekat jatuh tempo, maksimal poll_interval."""
+        async with db_core.get_connection() as db:
+            async with db.execute("SELECT MIN(next_attempt_at) FROM dm_outbox") as cursor:
+                next_due = (await cursor.fetchone())[0]
+        if next_due is None:
+            return self.poll_interval
+        return min(self.poll_interval, max(0.5, (next_due - _now_ms()) / 1000))
+
+    async def _due_rows(self) -> list:
+        async with db_core.get_connection() as db:
+            async with db.execute(
+                """
+                SELECT id, user_id, payload, attempts FROM dm_outbox
+                WHERE next_attempt_at <= ?
+                ORDER BY next_attempt_at
+                LIMIT 100
+                """,
+                (_now_ms(),),
+            ) as cursor:
+                rows = await cursor.fetchall()
+        return [row for row in rows if row[0] not in self._in_flight]
+
+    async def _deliver(self, outbox_id: int, user_id: int, payload_raw: str, attempts: int) -> None:
+        if outbox_id in self._delivered:
+            await self._delete(outbox_id)
+            self._delivered.discard(outbox_id)
+            return
+
+        payload = json.loads(payload_raw)
+        kwargs = {}
+        if payload["content"]:
+            kwargs["content"] = payload["content"]
+        if payload["embed"]:
+            kwargs["embed"] = discord.Embed.from_dict(payload["embed"])
+        if payload["file"]:
+            kwargs["file"] = discord.File(
+                io.BytesIO(payload["file"]["text"].encode("utf-8")),
+                filename=payload["file"]["name"],
+            )
+
+        try:
+            user = self._bot.get_user(user_id) or await self._bot.fetch_user(user_id)
+            await user.send(**kwargs)
+        except discord.Forbidden:
+            await self._mark_closed(outbox_id, user_id)
+            return
+        except discord.NotFound:
+            await self._delete(outbox_id)
+            self.failed += 1
+            return
+        except (discord.HTTPException, OSError, asyncio.TimeoutError) as error:
+            await self._reschedule(outbox_id, attempts + 1, str(error))
+            return
+
+        self._delivered.add(outbox_id)
+        self._closed_users.pop(user_id, None)
+        self.sent += 1
+
+        await self._delete(outbox_id)
+        self._delivered.discard(outbox_id)
+
+    async def _delete(self, outbox_id: int) -> None:
+        async with db_core.get_connection() as db:
+            await db.execute("DELETE FROM dm_outbox WHERE id = ?", (outbox_id,))
+            await db.commit()
+
+    async def _mark_closed(self, outbox_id: int, user_id: int) -> None:
+        now_ms = _now_ms()
+        async with db_core.transaction() as db:
+            await db.execute("DELETE FROM dm_outbox WHERE id = ?", (outbox_id,))
+            await db.execute(
+                """
+                INSERT INTO dm_closed_users (user_id, closed_at) VALUES (?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET closed_at = excluded.closed_at
+                """,
+                (user_id, now_ms),
+            )
+        self._closed_users[user_id] = now_ms
+        self.closed += 1
+
+    async def _reschedule(self, outbox_id: int, attempts: int, error: str) -> None:
+        if attempts >= self.max_attempts:
+            logger.warning(f"DM outbox {outbox_id} gave up after {attempts} attempts: {error}")
+            await self._delete(outbox_id)
+            self.failed += 1
+            return
+
+        delay_ms = int(self.base_delay * (2 ** (attempts - 1)) * 1000)
+        async with db_core.get_connection() as db:
+            await db.execute(
+                """
+                UPDATE dm_outbox
+                SET attempts = ?, next_attempt_at = ?, last_error = ?
+                WHERE id = ?
+                """,
+                (attempts, _now_ms() + delay_ms, error, outbox_id),
+            )
+            await db.commit()
+
+    async def pending_count(self) -> int:
+        async with db_core.get_connection() as db:
+            async with db.execute("SELECT COUNT(*) FROM dm_outbox") as cursor:
+                return (await cursor.fetchone())[0]
+
+
+dm_outbox = DMOutbox()
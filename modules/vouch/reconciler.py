@@ -0,0 +1,136 @@
+import asyncio
+import time
+
+import discord
+
+from config import config
+from modules.vouch.db import vouch_db
+from modules.vouch.views.helpers import role_scheduler
+from utils.logger import logger
+
+# Fix yang gagal sebanyak ini dihapus (dicatat di log), tidak dicoba lagi
+RECONCILE_MAX_ATTEMPTS = 5
+
+# Grup role akses yang saling eksklusif (lihat "Role Conflict" di /vouch)
+_ACCESS_GROUPS = (frozenset(config.MEMBER_ROLES), frozenset(config.FRIENDS_ROLES))
+
+
+def _holds_other_access(member: discord.Member, role_id: int) -> bool:
+    """True jika role_id adalah role akses dan member memegang role akses grup lain."""
+    if not any(role_id in group for group in _ACCESS_GROUPS):
+        return False
+
+    member_role_ids = {role.id for role in member.roles}
+    return any(
+        member_role_ids & group
+        for group in _ACCESS_GROUPS
+        if role_id not in group
+    )
+
+
+async def reconcile_roles(guild: discord.Guild, chunk_size: int = 500) -> dict:
+    """
+    Menerapkan ulang perubahan role dari redeem/revoke yang tidak
+    terkonfirmasi berhasil (tabel role_fixes).
+
+    - Fix ADD: role diberikan jika member belum memegangnya, kecuali
+      ia sudah memegang role akses dari grup lain.
+    - Fix REMOVE: role dicabut jika member masih memegangnya, kecuali
+      user yang sama punya kode USED lain untuk role tersebut.
+
+    Kode yang role-nya berhasil dipasang/dicabut saat redeem/revoke tidak
+    pernah muncul di sini, jadi keputusan moderator sesudahnya tidak
+    dibatalkan. Fix yang gagal dicoba lagi run berikutnya, maksimal
+    RECONCILE_MAX_ATTEMPTS kali per kode.
+
+    Returns:
+        Laporan jumlah drift dan hasil perbaikan.
+    """
+    started = time.perf_counter()
+    report = {
+        "codes_checked":     0,
+        "missing_granted":   0,
+        "lingering_revoked": 0,
+        "skipped_conflict":  0,
+        "unassignable":      0,
+        "members_fixed":     0,
+        "members_failed":    0,
+        "given_up":          0,
+    }
+
+    rows = await vouch_db.get_due_role_fixes(guild.id, time.time_ns() // 1_000_000)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        still_used = await vouch_db.get_used_roles(
+            guild.id, list({user_id for _, user_id, _, action, _ in chunk if action == "REMOVE"})
+        )
+
+        done:  list[str] = []
+        retry: list[tuple[str, int]] = []
+
+        # user_id → (member, role ditambah, role dicabut, [(code, attempts)])
+        fixes: dict[int, tuple[discord.Member, set[int], set[int], list[tuple[str, int]]]] = {}
+        for code, user_id, role_id, action, attempts in chunk:
+            report["codes_checked"] += 1
+            member = guild.get_member(user_id)
+            if member is None:
+                done.append(code)
+                continue
+
+            has_role = member.get_role(role_id) is not None
+            if action == "ADD" and not has_role:
+                if _holds_other_access(member, role_id):
+                    report["skipped_conflict"] += 1
+                    done.append(code)
+                    continue
+                report["missing_granted"] += 1
+                add_role = True
+            elif action == "REMOVE" and has_role and (user_id, role_id) not in still_used:
+                report["lingering_revoked"] += 1
+                add_role = False
+            else:
+                done.append(code)
+                continue
+
+            role = guild.get_role(role_id)
+            if role is None or not role.is_assignable():
+                report["unassignable"] += 1
+                done.append(code)
+                continue
+
+            _, add, remove, codes = fixes.setdefault(user_id, (member, set(), set(), []))
+            (add if add_role else remove).add(role_id)
+            codes.append((code, attempts))
+
+        # Lane background: redeem/revoke interaktif tidak mengantre di belakangnya
+        pending = [
+            (codes, role_scheduler.submit(
+                member,
+                add=[discord.Object(id=role_id) for role_id in add],
+                remove=[discord.Object(id=role_id) for role_id in remove],
+                reason="Vouch role reconcile",
+                background=True,
+            ))
+            for member, add, remove, codes in fixes.values()
+        ]
+        for codes, future in pending:
+            try:
+                await future
+            except Exception:
+                report["members_failed"] += 1
+                for code, attempts in codes:
+                    if attempts + 1 >= RECONCILE_MAX_ATTEMPTS:
+                        report["given_up"] += 1
+                        logger.warning(f"Role fix for code {code} gave up after {attempts + 1} attempts.")
+                        done.append(code)
+                    else:
+                        retry.append((code, attempts + 1))
+            else:
+                report["members_fixed"] += 1
+                done.extend(code for code, _ in codes)
+
+        await vouch_db.resolve_role_fixes(done, retry)
+        await asyncio.sleep(0)
+
+    report["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
@@ -1,8 +1,9 @@
-from modules.vouch.views.vouch_view import VouchView, SetupView
+from modules.vouch.views.vouch_view import VouchView, VouchMenuButton, SetupView
 from modules.vouch.views.helpers import send_log
 
 __all__ = [
     "VouchView",
+    "VouchMenuButton",
     "SetupView",
     "send_log",
 ]
@@ -1,5 +1,30 @@
+import time
 import discord
 from config import config
+from utils.log_sink import EmbedLogSink
+from utils.rate_limiter import RateLimiter
+from utils.role_scheduler import RoleMutationScheduler
+
+# ── Log Sink ──────────────────────────────────────────────────
+log_sink = EmbedLogSink()
+
+# ── Role Scheduler ────────────────────────────────────────────
+role_scheduler = RoleMutationScheduler(edits_per_second=config.ROLE_EDITS_PER_SECOND)
+
+# ── Rate Limiters ─────────────────────────────────────────────
+redeem_limiter = RateLimiter(
+    user_capacity=config.REDEEM_USER_BURST,
+    user_per_minute=config.REDEEM_USER_PER_MINUTE,
+    guild_capacity=config.REDEEM_GUILD_BURST,
+    guild_per_minute=config.REDEEM_GUILD_PER_MINUTE,
+)
+
+generate_limiter = RateLimiter(
+    user_capacity=config.GENERATE_USER_BURST,
+    user_per_minute=config.GENERATE_USER_PER_MINUTE,
+    guild_capacity=config.GENERATE_GUILD_BURST,
+    guild_per_minute=config.GENERATE_GUILD_PER_MINUTE,
+)
 
 
 async def send_log(guild: discord.Guild, embed: discord.Embed) -> None:
@@ -10,10 +35,8 @@ async def send_log(guild: discord.Guild, embed: discord.Embed) -> None:
     if log_channel is None:
         return
 
-    try:
-        await log_channel.send(embed=embed)
-    except discord.Forbidden:
-        pass
+    # Dikirim batch oleh log_sink (maks 10 embed per pesan)
+    log_sink.enqueue(log_channel, embed)
 
 
 def build_error_embed(title: str, description: str) -> discord.Embed:
@@ -30,3 +53,11 @@ def build_success_embed(title: str, description: str) -> discord.Embed:
         description=description,
         color=discord.Color.green(),
     )
+
+
+def build_rate_limited_embed(retry_after: float) -> discord.Embed:
+    retry_at = int(time.time() + retry_after) + 1
+    return build_error_embed(
+        "Slow Down",
+        f"Too many attempts. Please try again <t:{retry_at}:R>.",
+    )
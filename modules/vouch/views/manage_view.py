@@ -1,6 +1,7 @@
 import discord
 from modules.vouch.db import vouch_db
-from modules.vouch.views.helpers import send_log
+from modules.vouch.outbox import dm_outbox
+from modules.vouch.views.helpers import send_log, role_scheduler
 
 
 class ConfirmRevokeView(discord.ui.View):
@@ -34,10 +35,20 @@ class ConfirmRevokeView(discord.ui.View):
 
             if member and role:
                 try:
-                    await member.remove_roles(
-                        role,
+                    await role_scheduler.submit(
+                        member,
+                        remove=[role],
                         reason=f"Vouch revoked by {interaction.user.name}",
                     )
+                    log_lines.append(
+                        f"Role {role.mention} removed from {member.mention}."
+                    )
+                except (discord.Forbidden, discord.HTTPException):
+                    log_lines.append(
+                        "⚠️ Failed to remove role from user."
+                    )
+                else:
+                    await vouch_db.clear_role_fix(self.code)
                     dm_embed = discord.Embed(
                         title="⚠️  Vouch Revoked",
                         description=(
@@ -46,14 +57,7 @@ class ConfirmRevokeView(discord.ui.View):
                         ),
                         color=discord.Color.red(),
                     )
-                    await member.send(embed=dm_embed)
-                    log_lines.append(
-                        f"Role {role.mention} removed from {member.mention}."
-                    )
-                except (discord.Forbidden, discord.HTTPException):
-                    log_lines.append(
-                        "⚠️ Failed to remove role or send DM to user."
-                    )
+                    await dm_outbox.enqueue(member.id, embed=dm_embed)
         result_embed = discord.Embed(
             title="✅  Revoke Successful",
             description="\n".join(log_lines),
@@ -133,7 +137,7 @@ class ManageVouchSelect(discord.ui.Select):
         )
         detail_embed.add_field(name="Code",    value=f"`{code}`",                    inline=False)
         detail_embed.add_field(name="Status",  value=status,                         inline=True)
-        detail_embed.add_field(name="Created", value=str(created_at).split(".")[0],  inline=True)
+        detail_embed.add_field(name="Created", value=f"<t:{created_at // 1000}:f>",  inline=True)
 
         if used_by:
             detail_embed.add_field(
@@ -1,22 +1,47 @@
 import discord
 from modules.vouch.db import vouch_db
-from modules.vouch.views.helpers import send_log
+from modules.vouch.views.helpers import (
+    send_log,
+    redeem_limiter,
+    role_scheduler,
+    build_rate_limited_embed,
+)
+from utils.id_generator import IDGenerator
 
 
 class RedeemModal(discord.ui.Modal, title="🎟️  Redeem Vouch Code"):
 
     code_input = discord.ui.TextInput(
         label="Vouch Code",
-        placeholder="Example: V-ABCD-EFGH-IJKL",
+        placeholder="Example: V-ABCD-EFGH-IJKL-M",
         required=True,
         max_length=50,
         style=discord.TextStyle.short,
     )
 
     async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
+        retry_after = redeem_limiter.hit(interaction.user.id, interaction.guild_id)
+        if retry_after:
+            await interaction.response.send_message(
+                embed=build_rate_limited_embed(retry_after),
+                ephemeral=True,
+            )
+            return
 
         code = self.code_input.value.strip().upper()
+
+        # Typo / tebakan acak ditolak lewat check character, tanpa query database
+        if not IDGenerator.is_valid(code, allow_legacy=vouch_db.accepts_legacy_codes()):
+            error_embed = discord.Embed(
+                title="❌  Redemption Failed",
+                description="**Reason:** Invalid code format. Please check your code for typos.",
+                color=discord.Color.red(),
+            )
+            await interaction.response.send_message(embed=error_embed, ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
         success, role_id, is_first_time, message = await vouch_db.redeem_vouch(
             code, interaction.user.id
         )
@@ -39,8 +64,8 @@ class RedeemModal(discord.ui.Modal, title="🎟️  Redeem Vouch Code"):
             return
 
         try:
-            await interaction.user.add_roles(
-                role, reason=f"Vouch Redeem: {code}"
+            await role_scheduler.submit(
+                interaction.user, add=[role], reason=f"Vouch Redeem: {code}"
             )
         except discord.Forbidden:
             await interaction.followup.send(
@@ -49,6 +74,8 @@ class RedeemModal(discord.ui.Modal, title="🎟️  Redeem Vouch Code"):
             )
             return
 
+        await vouch_db.clear_role_fix(code)
+
         if is_first_time:
             from modules.vouch.views.first_time_view import FirstTimeRedeemView
             welcome_embed = discord.Embed(
@@ -1,62 +1,67 @@
+import time
 import discord
 from config import config
 from modules.vouch.db import vouch_db
+from modules.vouch.outbox import dm_outbox
 from modules.vouch.views.modals import RedeemModal
 from modules.vouch.views.manage_view import ManageVouchView
-from modules.vouch.views.helpers import send_log
+from modules.vouch.views.helpers import send_log, generate_limiter, build_rate_limited_embed
 from modules.profile.service import ProfileService
 from modules.profile.views import ProfileConfirmPostView
 from utils.id_generator import IDGenerator
+from utils.interaction_budget import latency_budget, respond
 
 
-class VouchView(discord.ui.View):
+# Role yang sudah punya akses (tidak boleh redeem lagi)
+_ACCESS_ROLE_IDS = frozenset(config.MEMBER_ROLES + config.FRIENDS_ROLES)
 
-    def __init__(self, can_generate: bool, can_redeem: bool):
-        super().__init__(timeout=None)
 
-        if can_generate:
-            btn_generate = discord.ui.Button(
-                label="Generate Vouch",
-                style=discord.ButtonStyle.primary,
-                custom_id="vouch_btn_generate",
-                emoji="🎫",
-                row=0,
-            )
-            btn_generate.callback = self._generate_callback
-            self.add_item(btn_generate)
-
-            btn_manage = discord.ui.Button(
-                label="Manage / Revoke",
-                style=discord.ButtonStyle.secondary,
-                custom_id="vouch_btn_manage",
-                emoji="📋",
-                row=0,
-            )
-            btn_manage.callback = self._manage_callback
-            self.add_item(btn_manage)
+def can_redeem(member: discord.Member) -> bool:
+    return not any(role.id in _ACCESS_ROLE_IDS for role in member.roles)
 
-        if can_redeem:
-            btn_redeem = discord.ui.Button(
-                label="Redeem Vouch",
-                style=discord.ButtonStyle.success,
-                custom_id="vouch_btn_redeem",
-                emoji="🎟️",
-                row=1,
+
+class VouchMenuButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"vouch_btn_(?P<action>generate|manage|redeem|profile)",
+):
+    """
+    Tombol menu /vouch yang stateless.
+
+    Di-route lewat custom_id (didaftarkan via bot.add_dynamic_items),
+    jadi tetap berfungsi setelah restart dan tidak perlu disimpan di
+    view store. Izin dicek ulang saat tombol diklik.
+    """
+
+    BUTTONS = {
+        "generate": dict(label="Generate Vouch",  style=discord.ButtonStyle.primary,   emoji="🎫", row=0),
+        "manage":   dict(label="Manage / Revoke", style=discord.ButtonStyle.secondary, emoji="📋", row=0),
+        "redeem":   dict(label="Redeem Vouch",    style=discord.ButtonStyle.success,   emoji="🎟️", row=1),
+        "profile":  dict(label="My Profile",      style=discord.ButtonStyle.secondary, emoji="👤", row=1),
+    }
+
+    def __init__(self, action: str):
+        super().__init__(
+            discord.ui.Button(
+                custom_id=f"vouch_btn_{action}",
+                **self.BUTTONS[action],
             )
-            btn_redeem.callback = self._redeem_callback
-            self.add_item(btn_redeem)
-
-        btn_profile = discord.ui.Button(
-            label="My Profile",
-            style=discord.ButtonStyle.secondary,
-            custom_id="vouch_btn_profile",
-            emoji="👤",
-            row=1,
         )
-        btn_profile.callback = self._profile_callback
-        self.add_item(btn_profile)
+        self.action = action
+
+    @classmethod
+    async def from_custom_id(
+        cls,
+        interaction: discord.Interaction,
+        item: discord.ui.Button,
+        match,
+    ):
+        return cls(match["action"])
 
+    async def callback(self, interaction: discord.Interaction):
+        handler = getattr(self, f"_{self.action}_callback")
+        await handler(interaction)
 
+    @latency_budget("vouch.profile")
     async def _profile_callback(
         self,
         interaction: discord.Interaction,
@@ -76,22 +81,34 @@ class VouchView(discord.ui.View):
             color=discord.Color.blurple(),
         )
 
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             embeds=[confirm_embed, preview_embed],
             view=ProfileConfirmPostView(target=interaction.user),
             ephemeral=True,
         )
 
+    @latency_budget("vouch.generate")
     async def _generate_callback(
         self,
         interaction: discord.Interaction,
     ):
         from modules.profile.service import ProfileService
 
+        retry_after = generate_limiter.hit(interaction.user.id, interaction.guild_id)
+        if retry_after:
+            await respond(
+                interaction,
+                embed=build_rate_limited_embed(retry_after),
+                ephemeral=True,
+            )
+            return
+
         vouch_tier = ProfileService.get_vouch_tier(interaction.user)
 
         if vouch_tier is None:
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 content="⛔ You do not have a tier that can generate a vouch code.",
                 ephemeral=True,
             )
@@ -102,20 +119,6 @@ class VouchView(discord.ui.View):
         tier_name        = vouch_tier["tier_name"]
         embed_color      = vouch_tier["color"]
 
-        can_gen = await vouch_db.can_generate(
-            interaction.user.id, cooldown_minutes
-        )
-        if not can_gen:
-            await interaction.response.send_message(
-                content=(
-                    f"⏳ You are currently in cooldown.\n"
-                    f"Tier **{tier_name}** only allows generating "
-                    f"**1 code every {cooldown_minutes} minutes**."
-                ),
-                ephemeral=True,
-            )
-            return
-
         user_role_ids = {role.id for role in interaction.user.roles}
 
         role_to_grant_id = None
@@ -134,20 +137,35 @@ class VouchView(discord.ui.View):
             if config.MEMBER_ROLES:
                 role_to_grant_id = config.MEMBER_ROLES[0]
             else:
-                await interaction.response.send_message(
+                await respond(
+                    interaction,
                     content="⚠️ Server configuration error: `ROLE_MEMBER_ID` not found in .env.",
                     ephemeral=True,
                 )
                 return
 
         new_code = IDGenerator.generate()
-        await vouch_db.create_vouch(
+        remaining_ms = await vouch_db.generate_vouch(
             code=new_code,
             guild_id=interaction.guild_id,
             role_id=role_to_grant_id,
             creator_id=interaction.user.id,
             rep_value=rep_value,
+            cooldown_minutes=cooldown_minutes,
         )
+        if remaining_ms:
+            ready_at = int(time.time() + remaining_ms / 1000)
+            await respond(
+                interaction,
+                content=(
+                    f"⏳ You are currently in cooldown.\n"
+                    f"Tier **{tier_name}** only allows generating "
+                    f"**1 code every {cooldown_minutes} minutes**. "
+                    f"You can generate again <t:{ready_at}:R>."
+                ),
+                ephemeral=True,
+            )
+            return
 
         role_obj = interaction.guild.get_role(role_to_grant_id)
         role_display = role_obj.name if role_obj else "Unknown Role"
@@ -162,29 +180,46 @@ class VouchView(discord.ui.View):
         dm_embed.add_field(name="Tier",      value=tier_name,               inline=True)
         dm_embed.add_field(name="Rep Grant", value=f"+{rep_value} Rep",     inline=True)
 
-        try:
-            await interaction.user.send(embed=dm_embed)
-            await interaction.response.send_message(
-                content="✅ Vouch code successfully created and sent to your DM.",
-                ephemeral=True,
-            )
-        except discord.Forbidden:
-            await interaction.response.send_message(
+        # DM tertutup (tercatat oleh outbox): tampilkan kode langsung
+        if dm_outbox.is_dm_closed(interaction.user.id):
+            await respond(
+                interaction,
                 content=(
                     f"⚠️ **Your DM is closed!** The code below is only shown once — "
                     f"please copy it now:\n```\n{new_code}\n```"
                 ),
                 ephemeral=True,
             )
+            return
 
+        await dm_outbox.enqueue(interaction.user.id, embed=dm_embed)
+        await respond(
+            interaction,
+            content=(
+                "✅ Vouch code successfully created and is on its way to your DM. "
+                "You can also find it under **Manage / Revoke**."
+            ),
+            ephemeral=True,
+        )
+
+    @latency_budget("vouch.manage")
     async def _manage_callback(
         self,
         interaction: discord.Interaction,
     ):
+        if ProfileService.get_vouch_tier(interaction.user) is None:
+            await respond(
+                interaction,
+                content="⛔ You do not have a tier that can manage vouch codes.",
+                ephemeral=True,
+            )
+            return
+
         vouches = await vouch_db.get_creator_vouches(interaction.user.id)
 
         if not vouches:
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 content="📭 You haven't created any vouch code yet.",
                 ephemeral=True,
             )
@@ -195,7 +230,8 @@ class VouchView(discord.ui.View):
             description="Select a code from the menu below to view details or remove it.",
             color=discord.Color.dark_grey(),
         )
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             embed=manage_embed,
             view=ManageVouchView(vouches),
             ephemeral=True,
@@ -205,9 +241,38 @@ class VouchView(discord.ui.View):
         self,
         interaction: discord.Interaction,
     ):
+        if not can_redeem(interaction.user):
+            await interaction.response.send_message(
+                content="⛔ You already have access and cannot redeem a vouch code.",
+                ephemeral=True,
+            )
+            return
+
         await interaction.response.send_modal(RedeemModal())
 
 
+class VouchView(discord.ui.View):
+    """
+    Menu /vouch. Hanya menyusun tombol; semua klik ditangani VouchMenuButton.
+    """
+
+    def __init__(self, can_generate: bool, can_redeem: bool):
+        super().__init__(timeout=None)
+
+        if can_generate:
+            self.add_item(VouchMenuButton("generate"))
+            self.add_item(VouchMenuButton("manage"))
+
+        if can_redeem:
+            self.add_item(VouchMenuButton("redeem"))
+
+        self.add_item(VouchMenuButton("profile"))
+
+        # View yang sudah di-stop tidak disimpan di view store saat dikirim,
+        # sehingga memori tetap datar berapapun jumlah menu yang dibuka.
+        self.stop()
+
+
 class SetupView(discord.ui.View):
 
     def __init__(self):
@@ -0,0 +1,10 @@
+import logging
+import os
+import sys
+
+# Modul bot di-import sebagai top-level package (config, database, modules, utils)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# setup_logger() tidak memasang handler lagi jika logger sudah punya handler,
+# jadi test tidak membuat/menulis apostle.log di root repo.
+logging.getLogger("ApostleBot").addHandler(logging.NullHandler())
@@ -0,0 +1,96 @@
+# tests/test_query_plans.py
+# ============================================================
+# Setiap statement runtime di modules/vouch/db.py harus memakai
+# index. Migrasi diterapkan ke database sementara, lalu tiap
+# statement dijalankan dengan EXPLAIN QUERY PLAN; full table scan
+# gagal kecuali memang disengaja (lihat ALLOWED_SCANS).
+# ============================================================
+
+import ast
+import asyncio
+import inspect
+import re
+import sqlite3
+
+import pytest
+
+from database.core import db_core
+from database.migrations import migrations
+import modules.vouch.db as vouch_db_module
+
+# Full load yang disengaja: (potongan statement, tabel yang boleh di-scan)
+ALLOWED_SCANS = {
+    ("FROM creator_cooldowns", "creator_cooldowns"),   # setup(): load cache cooldown
+}
+
+_DML = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+def _sql_text(node: ast.expr) -> str | None:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        # Bagian f-string (mis. daftar placeholder IN (...)) diganti satu "?"
+        return "".join(
+            part.value if isinstance(part, ast.Constant) else "?"
+            for part in node.values
+        )
+    return None
+
+
+def _runtime_statements() -> list[str]:
+    """Statement di dalam method VouchDatabase (bukan migrasi)."""
+    tree = ast.parse(inspect.getsource(vouch_db_module.VouchDatabase))
+    statements = []
+    for node in ast.walk(tree):
+        if not (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr in ("execute", "executemany")
+            and node.args
+        ):
+            continue
+        sql = _sql_text(node.args[0])
+        if sql and sql.strip().upper().startswith(_DML):
+            statements.append(" ".join(sql.split()))
+    return statements
+
+
+STATEMENTS = _runtime_statements()
+
+
+@pytest.fixture(scope="module")
+def schema_db(tmp_path_factory):
+    db_path = str(tmp_path_factory.mktemp("db") / "bot.sqlite")
+    original_path = db_core.db_path
+    db_core.db_path = db_path
+
+    async def apply() -> None:
+        await db_core.setup_core()
+        await migrations.run()
+        await db_core.close()
+
+    asyncio.run(apply())
+    db_core.db_path = original_path
+
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+
+def test_statements_found():
+    assert len(STATEMENTS) >= 10
+
+
+@pytest.mark.parametrize("sql", STATEMENTS)
+def test_statement_uses_index(schema_db, sql):
+    params = [None] * sql.count("?")
+    plan = schema_db.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+
+    scanned = {
+        match.group(1)
+        for *_, detail in plan
+        if (match := re.match(r"SCAN (\w+)", detail))
+    }
+    allowed = {table for fragment, table in ALLOWED_SCANS if fragment in sql}
+    assert not scanned - allowed, f"Full scan {scanned - allowed} in: {sql}\n{plan}"
@@ -10,35 +10,122 @@ import string
 
 class IDGenerator:
     """
-    Menghasilkan kode unik berformat: PREFIX-XXXX-XXXX-XXXX
-    
-    Contoh output: V-A3KD-92XZ-BT7P
-    
-    - Menggunakan secrets.choice() → aman secara kriptografis
+    Menghasilkan kode unik berformat: PREFIX-XXXX-XXXX-XXXX-C
+
+    Contoh output: V-A3KD-92XZ-BT7P-Q
+
+    - Satu buffer secrets.token_bytes() per batch → aman secara kriptografis
+    - Rejection sampling → distribusi karakter tetap seragam (tanpa modulo bias)
     - Huruf kapital + angka → mudah dibaca, tidak ambigu
+    - Karakter terakhir adalah check character (Luhn mod 36) → typo dan
+      tebakan acak ditolak sebelum menyentuh database
     - Dikelompokkan per 4 karakter → mudah diketik manual
     """
 
     ALPHABET = string.ascii_uppercase + string.digits
 
+    # Byte >= 252 dibuang agar b % 36 seragam (252 = 7 * 36)
+    _ACCEPT_LIMIT = 256 - (256 % len(ALPHABET))
+    _BYTE_TO_CHAR = (ALPHABET * (256 // len(ALPHABET) + 1))[:256].encode("ascii")
+    _REJECTED_BYTES = bytes(range(_ACCEPT_LIMIT, 256))
+    _CHAR_TO_VALUE = {char: value for value, char in enumerate(ALPHABET)}
+
     @staticmethod
-    def generate(prefix: str = "V", length: int = 12, group_size: int = 4) -> str:
+    def _random_chars(count: int) -> str:
+        """Mengambil `count` karakter acak dari ALPHABET via rejection sampling."""
+        chars = b""
+        while len(chars) < count:
+            # Lebihkan ~3% untuk menutup byte yang ditolak
+            needed = count - len(chars)
+            buffer = secrets.token_bytes(needed + needed // 32 + 8)
+            chars += buffer.translate(
+                IDGenerator._BYTE_TO_CHAR, IDGenerator._REJECTED_BYTES
+            )
+        return chars[:count].decode("ascii")
+
+    @staticmethod
+    def check_char(payload: str) -> str:
+        """Menghitung check character Luhn mod 36 untuk payload."""
+        base   = len(IDGenerator.ALPHABET)
+        factor = 2
+        total  = 0
+        for char in reversed(payload):
+            addend = factor * IDGenerator._CHAR_TO_VALUE[char]
+            total += addend // base + addend % base
+            factor = 1 if factor == 2 else 2
+        return IDGenerator.ALPHABET[(base - total % base) % base]
+
+    @staticmethod
+    def _format(prefix: str, raw_token: str, group_size: int) -> str:
+        groups = [
+            raw_token[i : i + group_size]
+            for i in range(0, len(raw_token), group_size)
+        ]
+        return f"{prefix}-" + "-".join(groups)
+
+    @staticmethod
+    def generate_batch(
+        amount: int,
+        prefix: str = "V",
+        length: int = 12,
+        group_size: int = 4,
+    ) -> list[str]:
         """
         Args:
+            amount     : Jumlah kode yang dibuat
             prefix     : Huruf awalan kode (default: "V" untuk Vouch)
             length     : Total panjang karakter acak (default: 12)
             group_size : Ukuran tiap kelompok karakter (default: 4)
-        
+
         Returns:
-            String kode berformat "PREFIX-XXXX-XXXX-XXXX"
+            List kode berformat "PREFIX-XXXX-XXXX-XXXX-C"
         """
-        raw_token = "".join(
-            secrets.choice(IDGenerator.ALPHABET) for _ in range(length)
-        )
+        pool = IDGenerator._random_chars(amount * length)
+        codes = []
+        for start in range(0, amount * length, length):
+            payload = pool[start : start + length]
+            raw_token = payload + IDGenerator.check_char(payload)
+            codes.append(IDGenerator._format(prefix, raw_token, group_size))
+        return codes
 
-        groups = [
-            raw_token[i : i + group_size]
-            for i in range(0, length, group_size)
-        ]
+    @staticmethod
+    def generate(prefix: str = "V", length: int = 12, group_size: int = 4) -> str:
+        """Menghasilkan satu kode. Lihat generate_batch()."""
+        return IDGenerator.generate_batch(1, prefix, length, group_size)[0]
+
+    @staticmethod
+    def generate_unique(amount: int, prefix: str = "V") -> list[str]:
+        """Menghasilkan `amount` kode yang dijamin unik satu sama lain."""
+        codes: set[str] = set()
+        while len(codes) < amount:
+            codes.update(IDGenerator.generate_batch(amount - len(codes), prefix=prefix))
+        return list(codes)
+
+    @staticmethod
+    def is_valid(
+        code: str,
+        prefix: str = "V",
+        length: int = 12,
+        allow_legacy: bool = False,
+    ) -> bool:
+        """
+        Validasi format dan check character tanpa query database.
+
+        Args:
+            allow_legacy : Terima juga kode lama tanpa check character.
+                           Hanya boleh True selama kode lama masih bisa aktif.
+        """
+        head, sep, body = code.partition("-")
+        if head != prefix or not sep:
+            return False
+
+        raw_token = body.replace("-", "")
+        if any(char not in IDGenerator._CHAR_TO_VALUE for char in raw_token):
+            return False
+
+        if len(raw_token) == length:
+            return allow_legacy
+        if len(raw_token) != length + 1:
+            return False
+        return IDGenerator.check_char(raw_token[:-1]) == raw_token[-1]
 
-        return f"{prefix}-" + "-".join(groups)
@@ -0,0 +1,118 @@
+# utils/interaction_budget.py
+# ============================================================
+# Latency budget untuk interaction handler.
+# Discord memberi waktu 3 detik sejak interaction dibuat untuk
+# response pertama. Decorator di sini otomatis men-defer jika
+# handler mendekati batas itu, dan mencatat latency per handler.
+# ============================================================
+
+import asyncio
+import functools
+import time
+
+import discord
+
+from utils.logger import logger
+
+# Batas Discord untuk response pertama, dan kapan auto-defer dilakukan
+RESPONSE_DEADLINE = 3.0
+AUTO_DEFER_AT     = 2.0
+
+
+def _elapsed(interaction: discord.Interaction) -> float:
+    """Detik sejak interaction dibuat oleh Discord (dari snowflake)."""
+    return time.time() - interaction.created_at.timestamp()
+
+
+def _response_lock(interaction: discord.Interaction) -> asyncio.Lock:
+    # Auto-defer dan respond() tidak boleh mengirim response pertama bersamaan
+    return interaction.extras.setdefault("_response_lock", asyncio.Lock())
+
+
+class LatencyStats:
+    """Statistik latency per handler (dalam milidetik)."""
+
+    def __init__(self):
+        self._handlers: dict[str, dict] = {}
+
+    def record(self, name: str, elapsed_ms: float, auto_deferred: bool) -> None:
+        entry = self._handlers.setdefault(
+            name,
+            {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "auto_deferred": 0},
+        )
+        entry["count"]    += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"]    = max(entry["max_ms"], elapsed_ms)
+        entry["auto_deferred"] += int(auto_deferred)
+
+    def snapshot(self) -> dict[str, dict]:
+        return {
+            name: {**entry, "avg_ms": entry["total_ms"] / entry["count"]}
+            for name, entry in self._handlers.items()
+        }
+
+
+latency_stats = LatencyStats()
+
+
+async def respond(interaction: discord.Interaction, **kwargs) -> None:
+    """
+    Kirim pesan sebagai response pertama, atau sebagai followup jika
+    interaction sudah di-defer (misalnya oleh auto-defer).
+    """
+    async with _response_lock(interaction):
+        if interaction.response.is_done():
+            await interaction.followup.send(**kwargs)
+        else:
+            await interaction.response.send_message(**kwargs)
+
+
+async def _auto_defer(interaction: discord.Interaction, name: str) -> bool:
+    await asyncio.sleep(max(0.0, AUTO_DEFER_AT - _elapsed(interaction)))
+
+    async with _response_lock(interaction):
+        if interaction.response.is_done():
+            return False
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+    logger.warning(
+        f"Auto-deferred '{name}' after {_elapsed(interaction) * 1000:.0f} ms."
+    )
+    return True
+
+
+def latency_budget(name: str | None = None):
+    """
+    Decorator untuk handler yang menerima discord.Interaction.
+
+    Handler harus mengirim response lewat respond() (bukan langsung
+    interaction.response.send_message) agar otomatis beralih ke followup
+    setelah auto-defer. Jangan dipakai pada handler yang membuka modal.
+    """
+
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            interaction = next(
+                arg for arg in args if isinstance(arg, discord.Interaction)
+            )
+            guard = asyncio.create_task(_auto_defer(interaction, label))
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                if guard.done() and not guard.cancelled():
+                    auto_deferred = guard.exception() is None and guard.result()
+                else:
+                    guard.cancel()
+                    auto_deferred = False
+
+                elapsed_ms = _elapsed(interaction) * 1000
+                latency_stats.record(label, elapsed_ms, auto_deferred)
+                if elapsed_ms > RESPONSE_DEADLINE * 1000 * 0.8:
+                    logger.warning(f"Slow handler '{label}': {elapsed_ms:.0f} ms.")
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,69 @@
+# utils/keyed_lock.py
+# ============================================================
+# Lock per-key dengan memori konstan (lock striping).
+# Key di-hash ke salah satu dari N asyncio.Lock yang tetap,
+# jadi tidak ada dict lock yang tumbuh tanpa batas.
+# ============================================================
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+class StripedLock:
+    """
+    Mutual exclusion per key menggunakan tabel lock berukuran tetap.
+
+    Dua key berbeda bisa berbagi stripe yang sama (false sharing),
+    tapi key yang sama selalu mendapat lock yang sama.
+
+    Contoh:
+        locks = StripedLock(stripes=64)
+        async with locks(user_id):
+            ...
+    """
+
+    def __init__(self, stripes: int = 64):
+        if stripes < 1:
+            raise ValueError("Jumlah stripe harus >= 1.")
+        self._locks = tuple(asyncio.Lock() for _ in range(stripes))
+
+        # ── Statistik ─────────────────────────────────────────
+        self.acquisitions = 0
+        self.contended    = 0
+        self.total_wait   = 0.0
+        self.max_wait     = 0.0
+
+    def lock_for(self, key) -> asyncio.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+    @asynccontextmanager
+    async def __call__(self, key):
+        lock = self.lock_for(key)
+
+        if lock.locked():
+            self.contended += 1
+            started = time.perf_counter()
+            await lock.acquire()
+            waited = time.perf_counter() - started
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        else:
+            await lock.acquire()
+
+        self.acquisitions += 1
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def stats(self) -> dict:
+        """Ringkasan contention: jumlah, rasio, dan waktu tunggu (detik)."""
+        return {
+            "stripes":       len(self._locks),
+            "acquisitions":  self.acquisitions,
+            "contended":     self.contended,
+            "contention":    self.contended / self.acquisitions if self.acquisitions else 0.0,
+            "avg_wait":      self.total_wait / self.contended if self.contended else 0.0,
+            "max_wait":      self.max_wait,
+        }
@@ -0,0 +1,136 @@
+# utils/log_sink.py
+# ============================================================
+# Sink async untuk embed log ke channel Discord.
+# Embed dikumpulkan per channel lalu dikirim sekaligus (maks 10
+# embed dan 6000 karakter per pesan), sehingga event beruntun tidak menghabiskan
+# bucket rate-limit channel satu per satu.
+# ============================================================
+
+import asyncio
+from collections import defaultdict, deque
+
+import aiohttp
+import discord
+
+from utils.logger import logger
+
+
+class EmbedLogSink:
+    """
+    Contoh:
+        log_sink = EmbedLogSink()
+        log_sink.enqueue(channel, embed)   # non-blocking
+        await log_sink.close()             # flush sisa antrean saat shutdown
+    """
+
+    MAX_EMBEDS_PER_MESSAGE = 10
+    # Batas Discord untuk total teks semua embed dalam satu pesan
+    MAX_CHARS_PER_MESSAGE  = 6000
+
+    def __init__(self, flush_interval: float = 2.0, max_retries: int = 3):
+        self.flush_interval = flush_interval
+        self.max_retries    = max_retries
+
+        self._queues: dict[int, deque[discord.Embed]] = defaultdict(deque)
+        self._channels: dict[int, discord.abc.Messageable] = {}
+        self._batch_full = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        self._closing = False
+
+        # ── Statistik ─────────────────────────────────────────
+        self.messages_sent = 0
+        self.embeds_sent   = 0
+        self.dropped       = 0
+
+    def start(self) -> None:
+        if self._closing:
+            return
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run(), name="embed-log-sink")
+
+    def enqueue(self, channel: discord.abc.Messageable, embed: discord.Embed) -> None:
+        self._channels[channel.id] = channel
+        queue = self._queues[channel.id]
+        queue.append(embed)
+        if len(queue) >= self.MAX_EMBEDS_PER_MESSAGE:
+            self._batch_full.set()
+        self.start()
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_full.clear()
+            try:
+                await self.flush()
+            except Exception as error:
+                # Worker harus tetap hidup; antrean dicoba lagi flush berikutnya
+                logger.error(f"Embed log sink flush failed: {error}")
+
+    async def flush(self) -> None:
+        """Mengirim semua embed yang mengantre, dikelompokkan per 10 / 6000 karakter."""
+        for channel_id, queue in list(self._queues.items()):
+            channel = self._channels[channel_id]
+            while queue:
+                await self._send(channel, self._take_batch(queue))
+
+    def _take_batch(self, queue: deque[discord.Embed]) -> list[discord.Embed]:
+        # Embed pertama selalu diambil agar embed yang terlalu besar hanya
+        # menggagalkan dirinya sendiri, bukan seluruh batch.
+        batch = [queue.popleft()]
+        chars = len(batch[0])
+        while (
+            queue
+            and len(batch) < self.MAX_EMBEDS_PER_MESSAGE
+            and chars + len(queue[0]) <= self.MAX_CHARS_PER_MESSAGE
+        ):
+            chars += len(queue[0])
+            batch.append(queue.popleft())
+        return batch
+
+    async def _send(self, channel: discord.abc.Messageable, batch: list[discord.Embed]) -> None:
+        last_error: Exception | None = None
+        for attempt in range(1, self.max_retries + 1):
+            retry_after = 2 ** attempt
+            try:
+                await channel.send(embeds=batch)
+                self.messages_sent += 1
+                self.embeds_sent   += len(batch)
+                return
+            except discord.HTTPException as error:
+                last_error = error
+                # 4xx selain 429 (embed invalid, tanpa izin) tidak akan berhasil diulang
+                if 400 <= error.status < 500 and error.status != 429:
+                    break
+                if error.status == 429:
+                    headers = getattr(error.response, "headers", None) or {}
+                    retry_after = float(headers.get("Retry-After", retry_after))
+            except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as error:
+                last_error = error
+            except Exception as error:
+                last_error = error
+                break
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(retry_after)
+
+        self.dropped += len(batch)
+        logger.warning(
+            f"Dropped {len(batch)} log embed(s) for channel {channel.id}: {last_error}"
+        )
+
+    async def close(self) -> None:
+        """Menghentikan worker dan mengirim sisa antrean."""
+        self._closing = True
+        self._batch_full.set()
+        if self._worker is not None:
+            try:
+                await self._worker
+            except Exception as error:
+                # Worker yang sudah mati tidak boleh menggagalkan shutdown
+                logger.error(f"Embed log sink worker crashed: {error}")
+            self._worker = None
+        await self.flush()
+        self._closing = False
@@ -2,14 +2,57 @@
 # ============================================================
 # Logger terpusat untuk seluruh bot.
 # Output ke console DAN file apostle.log secara bersamaan.
+# Handler di event loop hanya memasukkan record ke queue; I/O
+# file & console (termasuk rollover) dikerjakan thread listener.
 # ============================================================
 
+import copy
+import json
+import atexit
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from config import config
+
+_listener: QueueListener | None = None
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """Satu objek JSON per baris, untuk dibaca oleh log collector."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts":      datetime.fromtimestamp(record.created, tz=timezone.utc)
+                               .isoformat(timespec="milliseconds"),
+            "level":   record.levelname,
+            "logger":  record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _LocalQueueHandler(QueueHandler):
+    """
+    QueueHandler untuk listener di proses yang sama: pesan dibekukan saat
+    di-enqueue, tapi exc_info tidak digabung ke pesan sehingga formatter
+    (termasuk JSON) tetap menerima traceback secara terpisah.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg  = record.getMessage()
+        record.args = None
+        return record
 
 
 def setup_logger(name: str = "ApostleBot") -> logging.Logger:
+    global _listener
+
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
 
@@ -17,10 +60,13 @@ def setup_logger(name: str = "ApostleBot") -> logging.Logger:
     if logger.handlers:
         return logger
 
-    formatter = logging.Formatter(
-        fmt="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    if config.LOG_FORMAT == "json":
+        formatter = JSONLinesFormatter()
+    else:
+        formatter = logging.Formatter(
+            fmt="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
 
     # ── File Handler (dengan rotasi otomatis) ────────────────
     # Max 5MB per file, simpan 3 file backup
@@ -36,10 +82,33 @@ def setup_logger(name: str = "ApostleBot") -> logging.Logger:
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # ── Queue Handler ─────────────────────────────────────────
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(
+        log_queue,
+        file_handler,
+        console_handler,
+        respect_handler_level=True,
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    logger.addHandler(_LocalQueueHandler(log_queue))
 
     return logger
 
 
+def shutdown_logging() -> None:
+    """Menulis semua record yang masih di queue lalu menutup handler."""
+    global _listener
+
+    if _listener is None:
+        return
+
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
 logger = setup_logger()
@@ -0,0 +1,154 @@
+# utils/loop_watchdog.py
+# ============================================================
+# Watchdog untuk lag event loop.
+# Task probe mengukur keterlambatan penjadwalan (lag) secara
+# terus-menerus dan mencatatnya ke histogram. Thread pengawas
+# terpisah mendeteksi loop yang sedang macet dan mencatat stack
+# callback yang sedang berjalan, selagi callback itu masih jalan.
+# ============================================================
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from config import config
+from utils.logger import logger
+
+
+class LoopWatchdog:
+    """
+    Contoh:
+        loop_watchdog = LoopWatchdog(threshold=0.25)
+        loop_watchdog.start()          # dari dalam event loop
+        loop_watchdog.snapshot()       # histogram & statistik lag
+        await loop_watchdog.close()
+    """
+
+    # Batas atas tiap bucket histogram (ms); bucket terakhir = sisanya
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25):
+        self.interval  = interval
+        self.threshold = threshold
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._probe: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._heartbeat = time.monotonic()
+
+        # ── Statistik ─────────────────────────────────────────
+        self.histogram = [0] * (len(self.BUCKETS_MS) + 1)
+        self.samples   = 0
+        self.total_ms  = 0.0
+        self.max_ms    = 0.0
+        self.stalls: deque[dict] = deque(maxlen=10)
+
+    def start(self) -> None:
+        if self._probe is not None and not self._probe.done():
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+
+        self._probe = asyncio.create_task(self._run(), name="loop-watchdog")
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def close(self) -> None:
+        self._stop.set()
+        if self._probe is not None:
+            self._probe.cancel()
+            try:
+                await self._probe
+            except asyncio.CancelledError:
+                pass
+            self._probe = None
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+
+    # ── Probe (di event loop) ─────────────────────────────────
+
+    async def _run(self) -> None:
+        while True:
+            scheduled = self._loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (self._loop.time() - scheduled) * 1000)
+            self._heartbeat = time.monotonic()
+            self._record(lag_ms)
+
+            if lag_ms >= self.threshold * 1000:
+                logger.warning(f"Event loop lag: {lag_ms:.0f} ms.")
+
+    def _record(self, lag_ms: float) -> None:
+        bucket = len(self.BUCKETS_MS)
+        for index, upper_ms in enumerate(self.BUCKETS_MS):
+            if lag_ms <= upper_ms:
+                bucket = index
+                break
+
+        self.histogram[bucket] += 1
+        self.samples  += 1
+        self.total_ms += lag_ms
+        self.max_ms    = max(self.max_ms, lag_ms)
+
+    # ── Pengawas (di thread terpisah) ─────────────────────────
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+
+        while not self._stop.wait(self.interval):
+            heartbeat = self._heartbeat
+            blocked   = time.monotonic() - heartbeat - self.interval
+            if blocked < self.threshold or heartbeat == reported_heartbeat:
+                continue
+
+            # Laporkan sekali per macet; stack diambil selagi callback masih jalan
+            reported_heartbeat = heartbeat
+            self._report_stall(blocked)
+
+    def _report_stall(self, blocked: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else "<unavailable>"
+
+        task = asyncio.current_task(self._loop)
+        if task is not None:
+            coro = task.get_coro()
+            running = f"{task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+        else:
+            running = "<callback outside task>"
+
+        self.stalls.append({
+            "at":         time.time(),
+            "blocked_ms": blocked * 1000,
+            "running":    running,
+        })
+        logger.warning(
+            f"Event loop blocked for {blocked * 1000:.0f} ms, running {running}.\n"
+            f"Stack (most recent call last):\n{stack}"
+        )
+
+    # ── Snapshot ──────────────────────────────────────────────
+
+    def snapshot(self) -> dict:
+        labels = [f"≤{upper_ms} ms" for upper_ms in self.BUCKETS_MS]
+        labels.append(f">{self.BUCKETS_MS[-1]} ms")
+        return {
+            "samples":   self.samples,
+            "avg_ms":    self.total_ms / self.samples if self.samples else 0.0,
+            "max_ms":    self.max_ms,
+            "histogram": dict(zip(labels, self.histogram)),
+            "stalls":    list(self.stalls),
+        }
+
+
+loop_watchdog = LoopWatchdog(threshold=config.LOOP_LAG_THRESHOLD_MS / 1000)
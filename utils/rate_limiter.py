@@ -0,0 +1,125 @@
+# utils/rate_limiter.py
+# ============================================================
+# Rate limiter token-bucket in-memory, per user dan per guild.
+# Bucket yang idle (sudah penuh kembali) dibuang secara berkala
+# agar memori tidak tumbuh seiring jumlah user.
+# ============================================================
+
+import time
+
+
+class TokenBucketLimiter:
+    """
+    Satu bucket per key. Setiap request mengambil 1 token;
+    token terisi ulang sebesar `per_minute` token per menit
+    sampai maksimum `capacity` (burst).
+    """
+
+    def __init__(self, capacity: int, per_minute: float, sweep_interval: float = 60.0):
+        self.capacity = max(1, capacity)
+        self.rate     = max(per_minute, 0.001) / 60.0  # token per detik
+        self.sweep_interval = sweep_interval
+
+        # key → [tokens, last_update]
+        self._buckets: dict = {}
+        self._last_sweep = time.monotonic()
+
+    def _refill(self, key, now: float) -> list:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(self.capacity), now]
+            self._buckets[key] = bucket
+        else:
+            tokens, updated = bucket
+            bucket[0] = min(self.capacity, tokens + (now - updated) * self.rate)
+            bucket[1] = now
+        return bucket
+
+    def peek(self, key, now: float | None = None) -> float:
+        """Waktu tunggu (detik) sampai 1 token tersedia, tanpa mengambil token."""
+        now = time.monotonic() if now is None else now
+        tokens = self._refill(key, now)[0]
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def consume(self, key, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._refill(key, now)[0] -= 1
+        self._maybe_sweep(now)
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+
+        # Bucket yang sudah penuh kembali identik dengan bucket baru
+        full_after = self.capacity / self.rate
+        idle_keys = [
+            key for key, (tokens, updated) in self._buckets.items()
+            if now - updated >= full_after
+        ]
+        for key in idle_keys:
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RateLimiter:
+    """
+    Gabungan bucket per user dan per guild. Request lolos hanya jika
+    kedua bucket punya token; token baru diambil setelah keduanya lolos.
+
+    Contoh:
+        limiter = RateLimiter(user_capacity=5, user_per_minute=5,
+                              guild_capacity=60, guild_per_minute=120)
+        retry_after = limiter.hit(user_id, guild_id)
+        if retry_after:
+            ...  # tolak, coba lagi dalam retry_after detik
+    """
+
+    def __init__(
+        self,
+        user_capacity: int,
+        user_per_minute: float,
+        guild_capacity: int,
+        guild_per_minute: float,
+    ):
+        self.users  = TokenBucketLimiter(user_capacity, user_per_minute)
+        self.guilds = TokenBucketLimiter(guild_capacity, guild_per_minute)
+
+        # ── Statistik ─────────────────────────────────────────
+        self.allowed        = 0
+        self.rejected_user  = 0
+        self.rejected_guild = 0
+
+    def hit(self, user_id: int, guild_id: int | None) -> float:
+        """
+        Returns:
+            0 jika request diizinkan, selain itu detik sampai boleh mencoba lagi.
+        """
+        now = time.monotonic()
+
+        user_wait = self.users.peek(user_id, now)
+        if user_wait:
+            self.rejected_user += 1
+            return user_wait
+
+        if guild_id is not None:
+            guild_wait = self.guilds.peek(guild_id, now)
+            if guild_wait:
+                self.rejected_guild += 1
+                return guild_wait
+            self.guilds.consume(guild_id, now)
+
+        self.users.consume(user_id, now)
+        self.allowed += 1
+        return 0.0
+
+    def stats(self) -> dict:
+        return {
+            "allowed":        self.allowed,
+            "rejected_user":  self.rejected_user,
+            "rejected_guild": self.rejected_guild,
+            "user_buckets":   len(self.users),
+            "guild_buckets":  len(self.guilds),
+        }
@@ -0,0 +1,198 @@
+# utils/role_scheduler.py
+# ============================================================
+# Antrean terpusat untuk perubahan role member.
+# Beberapa perubahan untuk member yang sama digabung menjadi
+# satu giliran kirim, dan request dikirim dengan jeda tetap agar
+# tidak membanjiri bucket rate-limit member milik guild. Role
+# dipasang/dicabut lewat endpoint atomik per role, sehingga
+# perubahan role lain (moderator, bot lain) tidak tertimpa.
+# Edit background (rekonsiliasi) hanya dikirim saat antrean
+# interaktif kosong.
+# ============================================================
+
+import asyncio
+import time
+from collections import deque
+
+import discord
+
+from utils.logger import logger
+
+
+class _PendingEdit:
+    __slots__ = ("member", "add", "remove", "reasons", "futures", "enqueued_at", "background")
+
+    def __init__(self, member: discord.Member, background: bool):
+        self.member      = member
+        self.background  = background
+        self.add:     set[int] = set()
+        self.remove:  set[int] = set()
+        self.reasons: list[str] = []
+        self.futures: list[asyncio.Future] = []
+        self.enqueued_at = time.perf_counter()
+
+
+class RoleMutationScheduler:
+    """
+    Contoh:
+        applied = role_scheduler.submit(member, add=[role], reason="Vouch Redeem")
+        await applied   # selesai saat role sudah diterapkan (atau raise error Discord)
+
+        # Pekerjaan massal: didahului semua edit interaktif
+        role_scheduler.submit(member, add=[role], reason="Reconcile", background=True)
+    """
+
+    def __init__(self, edits_per_second: float = 5.0):
+        self.interval = 1.0 / max(edits_per_second, 0.1)
+
+        self._pending: dict[tuple[int, int], _PendingEdit] = {}
+        self._order: deque[tuple[int, int]] = deque()
+        self._background: deque[tuple[int, int]] = deque()
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        self._closing = False
+
+        # ── Statistik ─────────────────────────────────────────
+        self.applied       = 0
+        self.coalesced     = 0
+        self.failed        = 0
+        self.total_latency = 0.0
+        self.max_latency   = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._order) + len(self._background)
+
+    def start(self) -> None:
+        if self._closing:
+            return
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run(), name="role-scheduler")
+
+    def submit(
+        self,
+        member: discord.Member,
+        add: list[discord.abc.Snowflake] = (),
+        remove: list[discord.abc.Snowflake] = (),
+        reason: str | None = None,
+        background: bool = False,
+    ) -> asyncio.Future:
+        """
+        Menjadwalkan perubahan role. Perubahan yang belum terkirim untuk
+        member yang sama digabung; add/remove terakhir untuk role yang sama menang.
+
+        Args:
+            background : Prioritas rendah, dikirim setelah antrean interaktif habis
+
+        Returns:
+            Future yang selesai setelah edit diterapkan ke Discord.
+        """
+        key  = (member.guild.id, member.id)
+        edit = self._pending.get(key)
+        if edit is None:
+            edit = _PendingEdit(member, background)
+            self._pending[key] = edit
+            (self._background if background else self._order).append(key)
+        else:
+            edit.member = member
+            self.coalesced += 1
+            if edit.background and not background:
+                # Digabung dengan edit interaktif: ikut naik ke antrean interaktif
+                self._background.remove(key)
+                self._order.append(key)
+                edit.background = False
+
+        for role in add:
+            edit.remove.discard(role.id)
+            edit.add.add(role.id)
+        for role in remove:
+            edit.add.discard(role.id)
+            edit.remove.add(role.id)
+        if reason:
+            edit.reasons.append(reason)
+
+        future = asyncio.get_running_loop().create_future()
+        edit.futures.append(future)
+
+        self._wakeup.set()
+        self.start()
+        return future
+
+    async def _run(self) -> None:
+        while True:
+            if not self.queue_depth:
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            await self._apply(self._pop())
+            if self.queue_depth:
+                await asyncio.sleep(self.interval)
+
+    def _pop(self) -> _PendingEdit:
+        key = (self._order or self._background).popleft()
+        return self._pending.pop(key)
+
+    async def _apply(self, edit: _PendingEdit) -> None:
+        member = edit.member
+        reason = "; ".join(edit.reasons)[:512] or None
+        add    = [discord.Object(id=role_id) for role_id in edit.add]
+        remove = [discord.Object(id=role_id) for role_id in edit.remove]
+
+        try:
+            # atomic=True: PUT/DELETE per role, bukan menimpa seluruh daftar role
+            if add:
+                await member.add_roles(*add, reason=reason, atomic=True)
+            if remove:
+                await member.remove_roles(*remove, reason=reason, atomic=True)
+        except asyncio.CancelledError:
+            self._fail(edit, RuntimeError("Role scheduler stopped before the edit was applied."))
+            raise
+        except Exception as error:
+            self.failed += 1
+            logger.warning(f"Role edit for member {member.id} failed: {error}")
+            self._fail(edit, error)
+            return
+
+        latency = time.perf_counter() - edit.enqueued_at
+        self.applied       += 1
+        self.total_latency += latency
+        self.max_latency    = max(self.max_latency, latency)
+        for future in edit.futures:
+            if not future.done():
+                future.set_result(True)
+
+    @staticmethod
+    def _fail(edit: _PendingEdit, error: BaseException) -> None:
+        for future in edit.futures:
+            if not future.done():
+                future.set_exception(error)
+
+    async def close(self) -> None:
+        """Menerapkan sisa antrean lalu menghentikan worker."""
+        self._closing = True
+        self._wakeup.set()
+        if self._worker is not None:
+            try:
+                await self._worker
+            except Exception as error:
+                logger.error(f"Role scheduler worker crashed: {error}")
+            self._worker = None
+
+        # Worker mati sebelum antrean habis: selesaikan di sini
+        while self.queue_depth:
+            await self._apply(self._pop())
+        self._closing = False
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth":    self.queue_depth,
+            "background":     len(self._background),
+            "applied":        self.applied,
+            "coalesced":      self.coalesced,
+            "failed":         self.failed,
+            "avg_latency":    self.total_latency / self.applied if self.applied else 0.0,
+            "max_latency":    self.max_latency,
+        }
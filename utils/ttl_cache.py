@@ -0,0 +1,120 @@
+# utils/ttl_cache.py
+# ============================================================
+# Cache in-memory berukuran terbatas dengan TTL per entry.
+# Entry paling lama tidak dipakai dibuang saat cache penuh (LRU).
+# ============================================================
+
+import time
+from collections import OrderedDict
+
+# Penanda cache miss, karena None adalah nilai yang sah untuk di-cache
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Contoh:
+        cache = TTLCache(maxsize=1024, ttl=300)
+        value = cache.get(key)
+        if value is MISSING:
+            token = cache.begin_fill(key)
+            value = MISSING
+            try:
+                value = await load(key)
+            finally:
+                cache.end_fill(key, token, value)
+
+    set()/invalidate() selama load berjalan membatalkan fill tersebut,
+    sehingga hasil baca lama tidak menimpa nilai write-through yang baru.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl     = ttl
+        self._data: OrderedDict = OrderedDict()
+        # key → [jumlah fill yang berjalan, versi tulis]; hanya selama ada fill
+        self._fills: dict = {}
+
+        # ── Statistik ─────────────────────────────────────────
+        self.hits   = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return MISSING
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value) -> None:
+        self._bump(key)
+        self._store(key, value)
+
+    def invalidate(self, key) -> None:
+        self._bump(key)
+        self._data.pop(key, None)
+
+    def begin_fill(self, key) -> int:
+        """Menandai awal load setelah cache miss; hasilnya dipakai end_fill()."""
+        fill = self._fills.setdefault(key, [0, 0])
+        fill[0] += 1
+        return fill[1]
+
+    def end_fill(self, key, token: int, value=MISSING) -> bool:
+        """
+        Menyimpan hasil load hanya jika tidak ada set()/invalidate() untuk
+        key ini sejak begin_fill(). Pass MISSING jika load gagal.
+
+        Returns:
+            True jika nilai disimpan.
+        """
+        fill = self._fills[key]
+        fill[0] -= 1
+        fresh = fill[1] == token
+        if fill[0] == 0:
+            del self._fills[key]
+
+        if value is MISSING or not fresh:
+            return False
+        self._store(key, value)
+        return True
+
+    def _bump(self, key) -> None:
+        fill = self._fills.get(key)
+        if fill is not None:
+            fill[1] += 1
+
+    def _store(self, key, value) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        for fill in self._fills.values():
+            fill[1] += 1
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size":     len(self._data),
+            "maxsize":  self.maxsize,
+            "hits":     self.hits,
+            "misses":   self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }